@@ -9,6 +9,18 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URI: str = "mongodb://localhost:27017"
     MONGODB_DB: str = "mental_health"
+    MONGODB_ENSURE_INDEXES: bool = True  # create the indexes declared in app/db/mongodb.py at startup
+    MONGODB_MIN_POOL_SIZE: int = 0  # connections opened at startup and kept warm
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MAX_IDLE_TIME_MS: int | None = None  # close pooled connections idle for longer
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int | None = None  # fail instead of waiting forever for a free connection
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int | None = None  # driver default 30000
+    MONGODB_CONNECT_TIMEOUT_MS: int | None = None  # driver default 20000
+    MONGODB_SOCKET_TIMEOUT_MS: int | None = None  # driver default: no timeout
+    MONGODB_COMPRESSORS: str | None = None  # e.g. "zstd,snappy,zlib"; zstd needs `zstandard`, snappy `python-snappy`
+    MONGODB_ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"  # /mood and /messages reads
+    MONGODB_ANALYTICS_MAX_STALENESS_SECONDS: int | None = None  # >= 90 when set
+    MONGODB_WARM_POOL: bool = True  # ping and pre-open MONGODB_MIN_POOL_SIZE connections at startup
 
     # JWT
     JWT_SECRET_KEY: str = "CHANGE_ME"  # override in .env
@@ -24,6 +36,85 @@ class Settings(BaseSettings):
     # Translation
     USE_TR_EN_TRANSLATION: bool = True
     HF_TR_EN_MODEL: str = "Helsinki-NLP/opus-mt-tr-en"
+    LANGID_SKIP_ENGLISH: bool = True  # send text detected as English straight to the classifier
+    TRANSLATION_NUM_BEAMS: int = 1  # 1 = greedy decoding; the model's own config uses 4-beam search
+    TRANSLATION_LENGTH_RATIO: float = 1.5  # output token budget per source token
+    TRANSLATION_LENGTH_OFFSET: int = 10  # extra output tokens on top of the ratio
+    TRANSLATION_MAX_LENGTH: int = 512  # hard cap for source and output tokens
+
+    # Keyword/crisis lexicons: extra entries are read from the `lexicons` collection
+    LEXICON_RELOAD_SECONDS: float = 300  # 0 loads once at startup
+
+    # Tiered cascade: cheap tier-1 model first, translate+transformer only when it is unsure
+    CASCADE_ENABLED: bool = False
+    CASCADE_THRESHOLD: float = 0.75  # tier-1 top score needed (plus is_uncertain margin) to skip tier 2
+    CASCADE_MODEL_PATH: str = "models/tier1.json"  # written by scripts/train_tier1.py; keywords only if missing
+    CASCADE_AUDIT_RATE: float = 0.0  # share of confident tier-1 answers still sent to tier 2 to measure agreement
+
+    # Inference backend: "torch" (eager PyTorch) or "onnx" (ONNX Runtime, needs optimum[onnxruntime])
+    NLP_BACKEND: str = "torch"
+    ONNX_QUANTIZE: bool = True  # dynamic int8 quantization of the exported graphs
+    ONNX_EXPORT_DIR: str = "models/onnx"
+
+    # Local model snapshots written by scripts/snapshot_models.py (safetensors, loaded offline)
+    MODEL_SNAPSHOT_DIR: str = "models/snapshots"  # empty string always resolves models from the hub
+    MODEL_SNAPSHOT_REQUIRED: bool = False  # refuse to start model loading without a snapshot
+
+    # Model memory: resident weight budget, idle unloading of the translator, weight dtype
+    NLP_MEMORY_BUDGET_MB: float | None = None  # evict least recently used models beyond this
+    MT_IDLE_UNLOAD_SECONDS: float = 0  # unload MarianMT after this long unused; 0 keeps it resident
+    NLP_TORCH_DTYPE: str = "float32"  # "bfloat16" halves weight memory (torch backend only)
+
+    # Model registry: hot-swapped versions and shadow evaluation, set through PUT /admin/models
+    MODEL_REGISTRY_POLL_SECONDS: float = 30  # how often workers pick up the desired versions; 0 = startup only
+    SHADOW_CLASSIFIER: str | None = None  # candidate classifier scored alongside the active one
+    SHADOW_RATE: float = 0.0  # share of in-process traffic also scored by the shadow classifier
+    ADMIN_TOKEN: str | None = None  # X-Admin-Token for /admin endpoints; None disables them
+
+    # Load and warm both pipelines at startup; /ready stays 503 until done
+    NLP_PRELOAD: bool = False
+
+    # Inference micro-batching (concurrent /analyze calls share one forward pass)
+    NLP_BATCH_MAX_SIZE: int = 16
+    NLP_BATCH_MAX_WAIT_MS: float = 10.0
+    NLP_INFERENCE_BATCH_SIZE: int = 16  # padded sequences per forward pass (inputs are length-bucketed)
+    NLP_CHUNK_MAX_CHARS: int = 400  # longer messages are split into sentence chunks
+
+    # Admission control: past these limits /analyze degrades to keyword-only analysis
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_QUEUE_DEPTH: int = 128  # queued texts waiting for the models
+    ADMISSION_MAX_LATENCY_MS: float = 5000  # EWMA of model latency per request
+    ADMISSION_RECOVER_RATIO: float = 0.5  # recover once both signals fall below this share of the limits
+
+    # Shared out-of-process inference server (python -m app.services.inference_server)
+    NLP_SERVER_SOCKET: str | None = None  # Unix socket path; None keeps inference in-process
+    NLP_SERVER_TIMEOUT_SECONDS: float = 10.0
+    NLP_SERVER_FALLBACK: bool = True  # fall back to in-process models when the server is down
+
+    # Bulk /analyze/batch (imports); quota is counted in items, not calls
+    BATCH_ANALYZE_MAX_ITEMS: int = 500
+    BATCH_ANALYZE_ITEMS_PER_HOUR: int = 2000
+    BATCH_ANALYZE_CHUNK_SIZE: int = 32  # texts per forward pass
+
+    # Inference executor (blocking model calls run off the event loop)
+    NLP_EXECUTOR: str = "thread"  # "thread" or "process"
+    NLP_EXECUTOR_WORKERS: int = 1
+    NLP_MAX_IN_FLIGHT: int = 1  # concurrent forward passes
+    NLP_MAX_QUEUE: int = 256  # pending requests before /analyze answers 503
+    NLP_TORCH_THREADS: int | None = None  # intra-op threads per worker; None keeps torch default
+
+    # TR->EN translation cache
+    TRANSLATION_CACHE_SIZE: int = 5000  # in-memory entries; 0 disables
+    TRANSLATION_CACHE_BACKEND: str | None = None  # optional persistent tier: "file" or "mongo"
+    TRANSLATION_CACHE_PATH: str = "cache/translations.sqlite3"
+
+    # Whole-result analysis cache (scores + label per normalized text and model pair)
+    ANALYSIS_CACHE_SIZE: int = 10000  # 0 disables
+    ANALYSIS_CACHE_TTL_SECONDS: float | None = 24 * 3600
+
+    # Per-user daily mood rollups (`mood_rollups`); run scripts/rebuild_mood_rollups.py before enabling reads
+    MOOD_ROLLUPS_WRITE: bool = True  # $inc the rollup on every analyzed message and check-in
+    MOOD_ROLLUPS_READ: bool = False  # serve day-bucketed UTC trends from rollups instead of raw messages
 
     # Spotify API (Client Credentials)
     SPOTIFY_CLIENT_ID: str | None = None
@@ -1,13 +1,64 @@
+from typing import Any, Dict, List, NamedTuple, Tuple
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from ..core.config import settings
 
 _client: AsyncIOMotorClient | None = None
 _db: AsyncIOMotorDatabase | None = None
+_analytics_db: AsyncIOMotorDatabase | None = None
+
+_READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def _client_options() -> Dict[str, Any]:
+    # None leaves the driver default in place
+    options = {
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGODB_SOCKET_TIMEOUT_MS,
+        "compressors": settings.MONGODB_COMPRESSORS,
+    }
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def _analytics_read_preference():
+    mode = _READ_PREFERENCES.get(settings.MONGODB_ANALYTICS_READ_PREFERENCE)
+    if mode is None:
+        raise ValueError(f"Unknown MONGODB_ANALYTICS_READ_PREFERENCE {settings.MONGODB_ANALYTICS_READ_PREFERENCE!r}")
+    if mode is Primary:
+        return Primary()
+    return mode(max_staleness=settings.MONGODB_ANALYTICS_MAX_STALENESS_SECONDS or -1)
+
 
 async def connect_to_mongo():
-    global _client, _db
-    _client = AsyncIOMotorClient(settings.MONGODB_URI)
+    global _client, _db, _analytics_db
+    _client = AsyncIOMotorClient(settings.MONGODB_URI, **_client_options())
     _db = _client[settings.MONGODB_DB]
+    # same pool, different read preference: read-only dashboards may be served by secondaries
+    _analytics_db = _client.get_database(settings.MONGODB_DB, read_preference=_analytics_read_preference())
+
+
+async def warm_mongo_pool() -> int:
+    """Ping the server and open `MONGODB_MIN_POOL_SIZE` connections before traffic arrives.
+
+    Concurrent pings each check out their own connection; returns how many were opened.
+    """
+    assert _client is not None, "Database not initialized."
+    connections = max(1, settings.MONGODB_MIN_POOL_SIZE)
+    await asyncio.gather(*(_client.admin.command("ping") for _ in range(connections)))
+    return connections
 
 async def close_mongo_connection():
     global _client
@@ -20,12 +71,18 @@ def get_db() -> AsyncIOMotorDatabase:
     return _db
 
 
+def get_analytics_db() -> AsyncIOMotorDatabase:
+    """Database handle for read-only analytics; may return slightly stale data from a secondary."""
+    assert _analytics_db is not None, "Database not initialized."
+    return _analytics_db
+
+
 def users_collection():
     return get_db()["users"]
 
 
-def messages_collection():
-    return get_db()["messages"]
+def messages_collection(analytics: bool = False):
+    return (get_analytics_db() if analytics else get_db())["messages"]
 
 
 def suggestions_collection():
@@ -38,3 +95,86 @@ def checkins_collection():
 
 def feedback_collection():
     return get_db()["feedback"]
+
+
+def lexicons_collection():
+    return get_db()["lexicons"]
+
+
+def quotas_collection():
+    return get_db()["quotas"]
+
+
+def model_registry_collection():
+    return get_db()["model_registry"]
+
+
+def mood_rollups_collection(analytics: bool = False):
+    return (get_analytics_db() if analytics else get_db())["mood_rollups"]
+
+
+class IndexSpec(NamedTuple):
+    keys: List[Tuple[str, int]]
+    name: str
+    unique: bool = False
+    expire_after_seconds: int | None = None
+
+
+# Indexes the hot queries rely on, per collection; ensured at startup by `ensure_indexes`
+INDEXES: Dict[str, List[IndexSpec]] = {
+    # login/register and profile e-mail checks
+    "users": [IndexSpec([("email", 1)], "email_unique", unique=True)],
+    # /mood trends and /messages history: equality on user_id, range/sort on timestamp,
+    # _id as the keyset tie-breaker of the history cursor
+    "messages": [IndexSpec([("user_id", 1), ("timestamp", 1), ("_id", 1)], "user_id_timestamp_id")],
+    # /checkin/today and /checkin/summary
+    "checkins": [IndexSpec([("user_id", 1), ("timestamp", 1)], "user_id_timestamp")],
+    # suggestion lookup on every /analyze
+    "suggestions": [IndexSpec([("emotion", 1)], "emotion")],
+    # quota windows are upserted by this key and expire on their own
+    "quotas": [
+        IndexSpec([("user_id", 1), ("scope", 1), ("window_start", 1)], "user_scope_window", unique=True),
+        IndexSpec([("expires_at", 1)], "expires_at_ttl", expire_after_seconds=0),
+    ],
+    # one document per user and UTC day, upserted on every message and check-in
+    "mood_rollups": [IndexSpec([("user_id", 1), ("day", 1)], "user_id_day", unique=True)],
+    # persistent translation cache purges entries of other models
+    "translation_cache": [IndexSpec([("model", 1)], "model")],
+}
+
+
+def _key_pattern(info: Dict) -> List[Tuple[str, int]]:
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in info["key"]]
+
+
+async def ensure_indexes() -> Dict[str, List[str]]:
+    """Create missing declared indexes and report drift against `INDEXES`.
+
+    Indexes are matched by key pattern, not name. Returns lists of "collection.index" entries:
+    `created`, `mismatched` (same keys, different unique/TTL options; left as is),
+    `failed` (e.g. duplicates blocking a unique index) and `extra` (not declared here).
+    """
+    db = get_db()
+    report: Dict[str, List[str]] = {"created": [], "mismatched": [], "failed": [], "extra": []}
+    for collection, specs in INDEXES.items():
+        col = db[collection]
+        existing = await col.index_information()
+        matched = {"_id_"}
+        for spec in specs:
+            name = next((n for n, info in existing.items() if _key_pattern(info) == spec.keys), None)
+            if name is not None:
+                matched.add(name)
+                info = existing[name]
+                if bool(info.get("unique")) != spec.unique or info.get("expireAfterSeconds") != spec.expire_after_seconds:
+                    report["mismatched"].append(f"{collection}.{name}")
+                continue
+            options = {"name": spec.name, "unique": spec.unique}
+            if spec.expire_after_seconds is not None:
+                options["expireAfterSeconds"] = spec.expire_after_seconds
+            try:
+                await col.create_index(spec.keys, **options)
+                report["created"].append(f"{collection}.{spec.name}")
+            except OperationFailure as e:
+                report["failed"].append(f"{collection}.{spec.name}: {e}")
+        report["extra"].extend(f"{collection}.{n}" for n in existing if n not in matched)
+    return report
@@ -1,7 +1,10 @@
+import asyncio
+import logging
 import os
 import sys
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.middleware import SlowAPIMiddleware
 
@@ -18,9 +21,16 @@ from app.routers import profile as profile_router
 from app.routers import checkin as checkin_router
 from app.routers import feedback as feedback_router
 from app.routers import crisis as crisis_router
+from app.routers import admin as admin_router
 from app.core.config import settings
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, ensure_indexes, warm_mongo_pool
 from app.core.limiter import limiter, RateLimitExceeded, rate_limit_handler
+from app.services.nlp import (
+    close_inference, nlp_stats, warm_up_async, warmup_state, is_ready, reload_lexicons, lexicon_reload_loop, model_idle_loop,
+    sync_model_registry, model_registry_loop,
+)
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Mental Asistanım API",
@@ -56,6 +66,7 @@ app.include_router(spotify_router.router, prefix="/spotify", tags=["spotify"])
 app.include_router(checkin_router.router, prefix="/checkin", tags=["checkin"])  # daily check-ins
 app.include_router(feedback_router.router, prefix="/feedback", tags=["feedback"])  # thumbs up/down
 app.include_router(crisis_router.router, prefix="/crisis", tags=["crisis"])  # crisis resources
+app.include_router(admin_router.router, prefix="/admin", tags=["admin"])  # model registry (ADMIN_TOKEN)
 
 # Static uploads
 UPLOAD_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'uploads'))
@@ -66,13 +77,64 @@ app.mount("/uploads", StaticFiles(directory=UPLOAD_PATH), name="uploads")
 @app.on_event("startup")
 async def on_startup():
     await connect_to_mongo()
+    if settings.MONGODB_WARM_POOL:
+        try:
+            await warm_mongo_pool()
+        except Exception:
+            logger.exception("MongoDB ping failed at startup")
+    if settings.MONGODB_ENSURE_INDEXES:
+        try:
+            report = await ensure_indexes()
+        except Exception:
+            # serve anyway; queries still work without the indexes, only slower
+            logger.exception("MongoDB index check failed")
+        else:
+            app.state.index_report = report
+            for kind in ("created", "mismatched", "failed", "extra"):
+                level = logging.WARNING if kind in ("mismatched", "failed") else logging.INFO
+                for entry in report[kind]:
+                    logger.log(level, "MongoDB index %s: %s", kind, entry)
+    if settings.LEXICON_RELOAD_SECONDS > 0:
+        app.state.lexicon_task = asyncio.create_task(lexicon_reload_loop(settings.LEXICON_RELOAD_SECONDS))
+    else:
+        try:
+            await reload_lexicons()
+        except Exception:
+            pass  # builtin lexicons stay active
+    if settings.MODEL_REGISTRY_POLL_SECONDS > 0:
+        app.state.registry_task = asyncio.create_task(model_registry_loop(settings.MODEL_REGISTRY_POLL_SECONDS))
+    else:
+        try:
+            await sync_model_registry()
+        except Exception:
+            pass  # configured models stay active
+    if settings.MT_IDLE_UNLOAD_SECONDS > 0:
+        app.state.model_idle_task = asyncio.create_task(model_idle_loop(settings.MT_IDLE_UNLOAD_SECONDS))
+    if settings.NLP_PRELOAD:
+        # warm models in the background so the worker can answer /health meanwhile
+        warmup_state["status"] = "warming"
+        app.state.warmup_task = asyncio.create_task(warm_up_async())
 
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    await close_inference()
     await close_mongo_connection()
 
 
 @app.get("/health", tags=["meta"])
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/ready", tags=["meta"])
+async def ready():
+    # load balancers should route traffic only to workers with warm models
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "not_ready", "warmup": warmup_state})
+    return {"status": "ready", "warmup": warmup_state}
+
+
+@app.get("/metrics/nlp", tags=["meta"])
+async def nlp_metrics():
+    return nlp_stats()
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from datetime import datetime
+from ..deps import require_admin
+from ..db.mongodb import model_registry_collection
+from ..schemas.admin import ModelRegistryResponse, ModelSwapRequest
+from ..services.nlp import RegistryUnsupported, check_registry_supported, registry, sync_model_registry
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+async def _desired():
+    doc = await model_registry_collection().find_one({"_id": "active"}, {"_id": 0})
+    if doc and isinstance(doc.get("updated_at"), datetime):
+        doc["updated_at"] = doc["updated_at"].isoformat()
+    return doc
+
+
+@router.get("/models", response_model=ModelRegistryResponse)
+async def get_models():
+    return {**registry.state(), "desired": await _desired()}
+
+
+@router.put("/models", response_model=ModelRegistryResponse, status_code=202)
+async def swap_models(req: ModelSwapRequest, background_tasks: BackgroundTasks):
+    # every worker (and the inference server) picks the desired state up on its next poll;
+    # this worker starts loading right away, live traffic keeps using the current models
+    update = req.model_dump(exclude_unset=True)
+    if not update:
+        raise HTTPException(status_code=400, detail="Nothing to change")
+    try:
+        check_registry_supported()
+    except RegistryUnsupported as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    update["updated_at"] = datetime.utcnow()
+    await model_registry_collection().update_one({"_id": "active"}, {"$set": update}, upsert=True)
+    background_tasks.add_task(sync_model_registry)
+    return {**registry.state(), "desired": await _desired()}
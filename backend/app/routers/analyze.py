@@ -1,34 +1,90 @@
-from fastapi import APIRouter, Depends, Request
-from ..schemas.analysis import AnalyzeRequest, AnalyzeResponse, AnalyzeResult
-from ..services.nlp import analyze_text, top_label, keyword_emotion, detect_crisis, is_uncertain
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from pymongo.errors import BulkWriteError
+from ..schemas.analysis import AnalyzeRequest, AnalyzeResponse, AnalyzeResult, AnalyzeBatchRequest, AnalyzeBatchResponse, AnalyzeBatchResult
+from ..services.nlp import KEYWORD_VERSION, analyze_message, analyze_messages, detect_crisis, degraded_analysis
+from ..services.crisis import crisis_resources
 from ..db.mongodb import messages_collection
 from ..deps import get_current_user_id
-from datetime import datetime
+from datetime import datetime, timezone
+import logging
 from ..core.limiter import limiter
+from ..core.config import settings
 from ..services.suggestions import fetch_suggestion_text
+from ..services.inference import InferenceBusyError
+from ..services.quota import consume_quota, refund_quota, QuotaExceededError
+from ..services import rollups
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+async def _roll_up(user_id: str, timestamp: datetime, label: str, scores):
+    if not settings.MOOD_ROLLUPS_WRITE:
+        return
+    try:
+        await rollups.record_message(user_id, timestamp, label, scores)
+    except Exception:
+        # the message is stored; scripts/rebuild_mood_rollups.py repairs the rollup
+        logger.exception("Mood rollup update failed for user %s", user_id)
+
+
+async def _complete_scores(message_id, user_id: str, timestamp: datetime, text: str):
+    # Crisis path: the reply has already gone out; fill in the model scores afterwards
+    try:
+        scores, label, degraded, model_version = await analyze_message(text, priority=True)
+        update = {"emotion": label, "scores": scores, "scores_pending": False, "model_version": model_version}
+        if degraded:
+            update["degraded"] = True
+        await messages_collection().update_one({"_id": message_id}, {"$set": update})
+    except Exception:
+        # settle on the keyword-level result instead of leaving the message pending forever
+        logger.exception("Scoring crisis message %s failed; storing the keyword-level result", message_id)
+        scores, label = degraded_analysis(text)
+        update = {"emotion": label, "scores": scores, "scores_pending": False, "model_version": KEYWORD_VERSION, "degraded": True}
+        try:
+            await messages_collection().update_one({"_id": message_id}, {"$set": update})
+        except Exception:
+            logger.exception("Storing the keyword-level result of crisis message %s failed", message_id)
+            return
+    # counted once, with the final label
+    await _roll_up(user_id, timestamp, label, scores)
+
 
 @router.post("/", response_model=AnalyzeResponse)
 @limiter.limit("20/minute")
-async def analyze(request: Request, req: AnalyzeRequest, user_id: str = Depends(get_current_user_id)):
-    scores = analyze_text(req.text)
-    # crisis detection
+async def analyze(request: Request, req: AnalyzeRequest, background_tasks: BackgroundTasks, user_id: str = Depends(get_current_user_id)):
+    # crisis detection first, before any model work (never shed)
     crisis_flag, crisis_reason = detect_crisis(req.text)
-    # pick label with uncertainty handling
-    label = keyword_emotion(req.text) or top_label(scores)
-    if is_uncertain(scores):
-        label = "uncertain"
+    crisis = {"flagged": crisis_flag, "reason": crisis_reason} if crisis_flag else None
+
+    if crisis_flag:
+        # answer immediately with resources and a keyword-level label; the models run in
+        # the priority lane after the response and update the stored message
+        scores, label = degraded_analysis(req.text)
+        degraded = False
+        model_version = KEYWORD_VERSION
+    else:
+        # overload degrades to keyword-only analysis instead of failing the request
+        scores, label, degraded, model_version = await analyze_message(req.text)
 
     col = messages_collection()
-    await col.insert_one({
+    doc = {
         "user_id": user_id,
         "text": req.text,
         "emotion": label,
         "scores": scores,
-        "crisis": {"flagged": crisis_flag, "reason": crisis_reason} if crisis_flag else None,
+        "model_version": model_version,
+        "crisis": crisis,
         "timestamp": datetime.utcnow(),
-    })
+    }
+    if degraded:
+        doc["degraded"] = True
+    if crisis_flag:
+        doc["scores_pending"] = True
+    res = await col.insert_one(doc)
+    if crisis_flag:
+        background_tasks.add_task(_complete_scores, res.inserted_id, user_id, doc["timestamp"], req.text)
+    else:
+        await _roll_up(user_id, doc["timestamp"], label, scores)
 
     # Inline suggestion for chat reply UX
     suggestion_text = await fetch_suggestion_text(label)
@@ -36,5 +92,67 @@ async def analyze(request: Request, req: AnalyzeRequest, user_id: str = Depends(
     # Attach suggestion into response under result for backward compatibility
     result = AnalyzeResult(label=label, scores=scores)
     # Dynamically add attribute for suggestion (Pydantic will ignore unknown fields unless model updated)
-    payload = {"result": result.model_dump(), "suggestion_text": suggestion_text, "crisis": {"flagged": crisis_flag, "reason": crisis_reason} if crisis_flag else {"flagged": False}}
+    payload = {"result": result.model_dump(), "suggestion_text": suggestion_text, "crisis": crisis or {"flagged": False}, "degraded": degraded}
+    if crisis_flag:
+        payload["crisis_resources"] = [r.model_dump() for r in crisis_resources()]
+        payload["scores_pending"] = True
     return payload
+
+
+@router.post("/batch", response_model=AnalyzeBatchResponse)
+@limiter.exempt
+async def analyze_batch(req: AnalyzeBatchRequest, user_id: str = Depends(get_current_user_id)):
+    # Bulk import path: own item-based quota instead of the per-call rate limit
+    if len(req.items) > settings.BATCH_ANALYZE_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_ANALYZE_MAX_ITEMS} items per batch")
+    try:
+        charge = await consume_quota(
+            user_id, "analyze_batch", len(req.items), settings.BATCH_ANALYZE_ITEMS_PER_HOUR, window_seconds=3600
+        )
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    try:
+        texts = [item.text for item in req.items]
+        try:
+            analyses = await analyze_messages(texts, chunk_size=settings.BATCH_ANALYZE_CHUNK_SIZE)
+        except InferenceBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+        now = datetime.utcnow()
+        docs = []
+        crises = []
+        for item, (scores, label, model_version) in zip(req.items, analyses):
+            crisis_flag, crisis_reason = detect_crisis(item.text)
+            crises.append((crisis_flag, crisis_reason))
+            ts = item.timestamp.astimezone(timezone.utc).replace(tzinfo=None) if item.timestamp and item.timestamp.tzinfo else item.timestamp
+            docs.append({
+                "user_id": user_id,
+                "text": item.text,
+                "emotion": label,
+                "scores": scores,
+                "model_version": model_version,
+                "crisis": {"flagged": crisis_flag, "reason": crisis_reason} if crisis_flag else None,
+                "timestamp": ts or now,
+            })
+        res = await messages_collection().insert_many(docs, ordered=False)
+    except BaseException as e:
+        # shed or failed: refund what was not stored so a retried import does not pay twice
+        stored = e.details.get("nInserted", 0) if isinstance(e, BulkWriteError) else 0
+        await refund_quota(user_id, "analyze_batch", len(req.items) - stored, charge)
+        raise
+    if settings.MOOD_ROLLUPS_WRITE:
+        try:
+            await rollups.record_messages(docs)
+        except Exception:
+            logger.exception("Mood rollup update failed for a batch of user %s", user_id)
+
+    results = [
+        AnalyzeBatchResult(
+            id=str(_id),
+            label=doc["emotion"],
+            scores=doc["scores"],
+            crisis={"flagged": True, "reason": reason} if flagged else {"flagged": False},
+        )
+        for _id, doc, (flagged, reason) in zip(res.inserted_ids, docs, crises)
+    ]
+    return AnalyzeBatchResponse(items=results, quota_remaining=charge.remaining)
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from app.deps import get_current_user_id
 from app.db.mongodb import checkins_collection
+from app.core.config import settings
+from app.services import rollups
 from app.schemas.checkin import CheckInCreate, CheckIn, CheckInSummary
 from bson import ObjectId
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.post("/", response_model=CheckIn)
@@ -19,6 +23,12 @@ async def create_checkin(payload: CheckInCreate, user_id: str = Depends(get_curr
         "timestamp": datetime.utcnow(),
     }
     res = await col.insert_one(doc)
+    if settings.MOOD_ROLLUPS_WRITE:
+        try:
+            await rollups.record_checkin(user_id, doc["timestamp"], doc["score"])
+        except Exception:
+            # the check-in is stored; scripts/rebuild_mood_rollups.py repairs the rollup
+            logger.exception("Mood rollup update failed for user %s", user_id)
     return CheckIn(id=str(res.inserted_id), **doc)
 
 
@@ -1,21 +1,83 @@
-from fastapi import APIRouter, Depends, Query
-from ..schemas.message import MessagesResponse, MessageOut
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Literal, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime
+import base64
+import binascii
+import json
+from ..schemas.message import MessagesResponse
 from ..db.mongodb import messages_collection
 from ..deps import get_current_user_id
 
 router = APIRouter()
 
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    raw = json.dumps({"t": doc["timestamp"].isoformat(), "id": str(doc["_id"])}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return datetime.fromisoformat(raw["t"]), ObjectId(raw["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _query(user_id: str, cursor: Optional[str]) -> Dict[str, Any]:
+    # rows without a timestamp cannot carry a cursor; every write path sets one
+    query: Dict[str, Any] = {"user_id": user_id, "timestamp": {"$type": "date"}}
+    if cursor:
+        # keyset: strictly older than the last row of the previous page, _id breaks timestamp ties
+        ts, last_id = decode_cursor(cursor)
+        query["$or"] = [{"timestamp": {"$lt": ts}}, {"timestamp": ts, "_id": {"$lt": last_id}}]
+    return query
+
+
+def _out(doc: Dict[str, Any], scores: bool) -> Dict[str, Any]:
+    item = {
+        "id": str(doc["_id"]),
+        "text": doc.get("text", ""),
+        "emotion": doc.get("emotion", "unknown"),
+        "timestamp": doc["timestamp"].isoformat(),
+    }
+    if scores:
+        item["scores"] = doc.get("scores", {})
+    return item
+
+
 @router.get("/", response_model=MessagesResponse)
-async def list_messages(user_id: str = Depends(get_current_user_id), limit: int = Query(50, le=200)):
-    col = messages_collection()
-    cursor = col.find({"user_id": user_id}).sort("timestamp", -1).limit(limit)
-    items = []
-    async for doc in cursor:
-        items.append(MessageOut(
-            id=str(doc.get("_id")),
-            text=doc.get("text", ""),
-            emotion=doc.get("emotion", "unknown"),
-            scores=doc.get("scores", {}),
-            timestamp=doc.get("timestamp").isoformat() if doc.get("timestamp") else "",
-        ))
-    return MessagesResponse(items=items)
+async def list_messages(
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="`next` token of the previous page"),
+    scores: bool = Query(False, description="Include the per-label model scores"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams the whole history from `cursor` on"),
+):
+    col = messages_collection(analytics=True)
+    projection = {"text": 1, "emotion": 1, "timestamp": 1}
+    if scores:
+        projection["scores"] = 1
+    # newest first on the (user_id, timestamp, _id) index; every page is one index seek
+    find = col.find(_query(user_id, cursor), projection).sort([("timestamp", -1), ("_id", -1)])
+
+    if format == "ndjson":
+        async def lines():
+            # one line per document as the cursor yields its batches; nothing is held beyond a batch
+            async for doc in find.batch_size(STREAM_BATCH_SIZE):
+                yield json.dumps(_out(doc, scores), ensure_ascii=False) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    # one extra row tells whether an older page exists
+    docs = await find.limit(limit + 1).to_list(length=limit + 1)
+    page = docs[:limit]
+    return MessagesResponse(
+        items=[_out(doc, scores) for doc in page],
+        next=encode_cursor(page[-1]) if len(docs) > limit else None,
+    )
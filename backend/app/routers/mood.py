@@ -1,29 +1,105 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, Dict, List, Literal, Optional
+from pymongo.errors import OperationFailure
 from ..schemas.mood import MoodTrendResponse, MoodPoint
 from ..db.mongodb import messages_collection
 from ..deps import get_current_user_id
+from ..core.config import settings
+from ..services import rollups
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
+Bucket = Literal["hour", "day", "week", "month"]
+
 @router.get("/weekly", response_model=MoodTrendResponse)
-async def weekly(user_id: str = Depends(get_current_user_id)):
-    return await _trend(user_id, days=7)
+async def weekly(user_id: str = Depends(get_current_user_id), bucket: Optional[Bucket] = None, tz: str = "UTC"):
+    return await _trend(user_id, days=7, bucket=bucket, tz=tz)
 
 @router.get("/monthly", response_model=MoodTrendResponse)
-async def monthly(user_id: str = Depends(get_current_user_id)):
-    return await _trend(user_id, days=30)
+async def monthly(user_id: str = Depends(get_current_user_id), bucket: Optional[Bucket] = None, tz: str = "UTC"):
+    return await _trend(user_id, days=30, bucket=bucket, tz=tz)
+
+@router.get("/trend", response_model=MoodTrendResponse)
+async def trend(
+    user_id: str = Depends(get_current_user_id),
+    days: int = Query(30, ge=1, le=3650),
+    bucket: Optional[Bucket] = Query(None, description="Group points per hour/day/week/month; ranges over 31 days default to day"),
+    tz: str = Query("UTC", description="Olson time zone used for bucket boundaries"),
+):
+    # long ranges are bucketed so the response size does not grow with message volume
+    if bucket is None and days > 31:
+        bucket = "day"
+    return await _trend(user_id, days=days, bucket=bucket, tz=tz)
+
+def _trend_pipeline(user_id: str, since: datetime, bucket: Optional[str], tz: str) -> List[Dict[str, Any]]:
+    # $match + $sort on the (user_id, timestamp) index; only timestamp and emotion leave it
+    points: List[Dict[str, Any]]
+    if bucket:
+        points = [
+            {"$group": {
+                "_id": {"bucket": {"$dateTrunc": {"date": "$timestamp", "unit": bucket, "timezone": tz}}, "label": "$label"},
+                "count": {"$sum": 1},
+            }},
+            {"$group": {"_id": "$_id.bucket", "counts": {"$push": {"k": "$_id.label", "v": "$count"}}, "total": {"$sum": "$count"}}},
+            {"$sort": {"_id": 1}},
+        ]
+    else:
+        points = [{"$project": {"timestamp": 1, "label": 1}}]
+    return [
+        {"$match": {"user_id": user_id, "timestamp": {"$gte": since}}},
+        {"$sort": {"timestamp": 1}},
+        {"$project": {"_id": 0, "timestamp": 1, "label": {"$ifNull": ["$emotion", "unknown"]}}},
+        {"$facet": {
+            "points": points,
+            "distribution": [{"$group": {"_id": "$label", "count": {"$sum": 1}}}],
+        }},
+    ]
+
+async def _rollup_trend(user_id: str, since: datetime) -> MoodTrendResponse:
+    # one small document per day instead of every message of the range
+    points = []
+    distribution: Dict[str, int] = {}
+    for doc in await rollups.daily_rollups(user_id, since):
+        day = rollups.summarize(doc)
+        counts = day["emotions"]
+        for label, n in counts.items():
+            distribution[label] = distribution.get(label, 0) + n
+        if not day["messages"]:
+            continue  # check-ins only
+        points.append(MoodPoint(
+            timestamp=day["day"].isoformat(),
+            label=max(counts.items(), key=lambda kv: kv[1])[0],
+            count=day["messages"],
+            distribution=counts,
+            mean_scores=day["mean_scores"],
+            checkin_avg=day["checkin_avg"],
+        ))
+    return MoodTrendResponse(points=points, distribution=distribution)
 
-async def _trend(user_id: str, days: int) -> MoodTrendResponse:
-    col = messages_collection()
+async def _trend(user_id: str, days: int, bucket: Optional[str] = None, tz: str = "UTC") -> MoodTrendResponse:
     since = datetime.utcnow() - timedelta(days=days)
+    if settings.MOOD_ROLLUPS_READ and bucket == "day" and tz == "UTC":
+        return await _rollup_trend(user_id, since)
+    col = messages_collection(analytics=True)
 
-    cursor = col.find({"user_id": user_id, "timestamp": {"$gte": since}}).sort("timestamp", 1)
+    try:
+        result = await col.aggregate(_trend_pipeline(user_id, since, bucket, tz)).to_list(length=1)
+    except OperationFailure as e:
+        # e.g. an unknown time zone in $dateTrunc
+        raise HTTPException(status_code=400, detail=f"Invalid trend query: {e}")
+    facets = result[0] if result else {"points": [], "distribution": []}
+    distribution = {row["_id"]: row["count"] for row in facets["distribution"]}
+    if not bucket:
+        points = [MoodPoint(timestamp=p["timestamp"].isoformat(), label=p["label"]) for p in facets["points"]]
+        return MoodTrendResponse(points=points, distribution=distribution)
     points = []
-    distribution = {}
-    async for doc in cursor:
-        ts = doc["timestamp"].isoformat()
-        label = doc.get("emotion", "unknown")
-        points.append(MoodPoint(timestamp=ts, label=label))
-        distribution[label] = distribution.get(label, 0) + 1
+    for row in facets["points"]:
+        counts = {c["k"]: c["v"] for c in row["counts"]}
+        points.append(MoodPoint(
+            timestamp=row["_id"].isoformat(),
+            label=max(counts.items(), key=lambda kv: kv[1])[0],
+            count=row["total"],
+            distribution=counts,
+        ))
     return MoodTrendResponse(points=points, distribution=distribution)
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+class ModelSwapRequest(BaseModel):
+    classifier: Optional[str] = Field(default=None, description="Classifier model id or snapshot name to activate")
+    translator: Optional[str] = Field(default=None, description="TR->EN translator model id to activate")
+    shadow_classifier: Optional[str] = Field(default=None, description="Candidate classifier for shadow evaluation; null turns it off")
+    shadow_rate: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+class ModelRegistryResponse(BaseModel):
+    active: Dict[str, Optional[str]]
+    desired: Optional[Dict[str, Any]] = None
+    shadow_rate: float
+    failed: Dict[str, str]
+    synced_at: Optional[str] = None
+    shadow: Dict[str, Any]
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import Dict, List, Optional
+from .crisis import CrisisResource
 
 class AnalyzeRequest(BaseModel):
     text: str = Field(min_length=1, description="User message to analyze")
@@ -12,3 +14,24 @@ class AnalyzeResponse(BaseModel):
     result: AnalyzeResult
     suggestion_text: Optional[str] = None
     crisis: Optional[Dict[str, str | bool]] = None  # {flagged: bool, reason?: str}
+    degraded: bool = False  # True when overload skipped the models (keyword-only result)
+    crisis_resources: Optional[List[CrisisResource]] = None  # sent right away for crisis-flagged messages
+    scores_pending: bool = False  # True when emotion scores are still being computed in the background
+
+
+class AnalyzeBatchItem(BaseModel):
+    text: str = Field(min_length=1)
+    timestamp: Optional[datetime] = None  # original time for imported entries; defaults to now
+
+class AnalyzeBatchRequest(BaseModel):
+    items: List[AnalyzeBatchItem] = Field(min_length=1)
+
+class AnalyzeBatchResult(BaseModel):
+    id: str
+    label: str
+    scores: Dict[str, float]
+    crisis: Dict[str, str | bool]
+
+class AnalyzeBatchResponse(BaseModel):
+    items: List[AnalyzeBatchResult]
+    quota_remaining: int
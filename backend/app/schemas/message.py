@@ -1,12 +1,13 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class MessageOut(BaseModel):
     id: str
     text: str
     emotion: str
-    scores: Dict[str, float]
+    scores: Optional[Dict[str, float]] = None  # only with ?scores=true
     timestamp: str
 
 class MessagesResponse(BaseModel):
     items: List[MessageOut]
+    next: Optional[str] = None  # opaque cursor for the next (older) page; absent on the last page
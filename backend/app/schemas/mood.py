@@ -1,9 +1,13 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class MoodPoint(BaseModel):
     timestamp: str
-    label: str
+    label: str  # message label, or the most frequent label of the bucket
+    count: Optional[int] = None  # messages in the bucket (bucketed trends only)
+    distribution: Optional[Dict[str, int]] = None  # label counts in the bucket (bucketed trends only)
+    mean_scores: Optional[Dict[str, float]] = None  # average model scores of the day (rollup-served trends only)
+    checkin_avg: Optional[float] = None  # average check-in score of the day (rollup-served trends only)
 
 class MoodTrendResponse(BaseModel):
     points: List[MoodPoint]
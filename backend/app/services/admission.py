@@ -0,0 +1,77 @@
+from typing import Any, Callable, Dict
+import threading
+import time
+
+
+class AdmissionController:
+    """Decides whether a request may use the models or must degrade to keyword-only analysis.
+
+    Load is judged by the inference queue depth and an EWMA of model latency. The controller
+    trips when either crosses its limit and recovers (hysteresis) once both fall below
+    `recover_ratio` of the limits. While degraded no latency samples arrive, so one probe
+    request is admitted every `probe_seconds` to notice when load has dropped.
+    """
+
+    def __init__(
+        self,
+        depth_fn: Callable[[], int],
+        max_queue_depth: int,
+        max_latency_ms: float,
+        recover_ratio: float = 0.5,
+        probe_seconds: float = 2.0,
+        alpha: float = 0.2,
+    ):
+        self._depth_fn = depth_fn
+        self.max_queue_depth = max_queue_depth
+        self.max_latency = max_latency_ms / 1000.0
+        self.recover_ratio = recover_ratio
+        self.probe_seconds = probe_seconds
+        self.alpha = alpha
+        self.latency_ewma = 0.0
+        self.degraded = False
+        self._last_sample = 0.0
+        self._last_probe = 0.0
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.shed = 0
+        self.trips = 0
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.latency_ewma = seconds if self._last_sample == 0.0 else (1 - self.alpha) * self.latency_ewma + self.alpha * seconds
+            self._last_sample = time.monotonic()
+            self._update(self._depth_fn())
+
+    def _update(self, depth: int):
+        if not self.degraded:
+            if depth >= self.max_queue_depth or self.latency_ewma >= self.max_latency:
+                self.degraded = True
+                self.trips += 1
+        elif depth <= self.max_queue_depth * self.recover_ratio and self.latency_ewma <= self.max_latency * self.recover_ratio:
+            self.degraded = False
+
+    def admit(self) -> bool:
+        with self._lock:
+            self._update(self._depth_fn())
+            if not self.degraded:
+                self.admitted += 1
+                return True
+            now = time.monotonic()
+            if now - self._last_probe >= self.probe_seconds and now - self._last_sample >= self.probe_seconds:
+                self._last_probe = now
+                self.admitted += 1
+                return True
+            self.shed += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "degraded": self.degraded,
+            "queue_depth": self._depth_fn(),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1),
+            "max_queue_depth": self.max_queue_depth,
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "trips": self.trips,
+        }
@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Tuple, TypeVar
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from ..core.config import settings
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe bounded LRU with optional TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_size: int, ttl_seconds: float | None = None):
+        self.max_size = max(0, max_size)
+        self.ttl = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            stored_at, value = item
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def text_key(*parts: str) -> str:
+    """Content address for a cache entry: sha256 over the parts, NUL-separated."""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class _SqliteTier:
+    """Local file tier so translations survive restarts on a single node."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, model TEXT, value TEXT)")
+            self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, model: str, value: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO translations (key, model, value) VALUES (?, ?, ?)", (key, model, value))
+            self._conn.commit()
+
+    def purge_other_models(self, model: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM translations WHERE model != ?", (model,))
+            self._conn.commit()
+
+
+class _MongoTier:
+    """Shared tier in MongoDB. Uses a sync client because lookups happen on inference threads."""
+
+    def __init__(self):
+        from pymongo import MongoClient
+
+        self._col = MongoClient(settings.MONGODB_URI)[settings.MONGODB_DB]["translation_cache"]
+
+    def get(self, key: str) -> str | None:
+        doc = self._col.find_one({"_id": key}, {"value": 1})
+        return doc.get("value") if doc else None
+
+    def set(self, key: str, model: str, value: str):
+        self._col.replace_one({"_id": key}, {"_id": key, "model": model, "value": value}, upsert=True)
+
+    def purge_other_models(self, model: str):
+        self._col.delete_many({"model": {"$ne": model}})
+
+
+class TranslationCache:
+    """Memory LRU in front of an optional persistent tier, keyed by model + normalized text.
+
+    Entries are bound to the translation model name: when `HF_TR_EN_MODEL` changes the
+    memory tier is dropped and stale persistent entries are purged.
+    """
+
+    def __init__(self, max_size: int, backend: str | None, path: str):
+        self.memory: LRUCache[str] = LRUCache(max_size)
+        self.backend = backend
+        self._path = path
+        self._tier: _SqliteTier | _MongoTier | None = None
+        self._tier_failed = False
+        self._model: str | None = None
+        self.persistent_hits = 0
+
+    def _get_tier(self):
+        if self._tier is None and self.backend and not self._tier_failed:
+            try:
+                if self.backend == "file":
+                    os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+                    self._tier = _SqliteTier(self._path)
+                elif self.backend == "mongo":
+                    self._tier = _MongoTier()
+            except Exception:
+                # persistent tier is best-effort; keep serving from memory
+                self._tier_failed = True
+        return self._tier
+
+    def _check_model(self, model: str):
+        if self._model != model:
+            self.memory.clear()
+            tier = self._get_tier()
+            if tier is not None and self._model is not None:
+                try:
+                    tier.purge_other_models(model)
+                except Exception:
+                    pass
+            self._model = model
+
+    def get(self, model: str, normalized_text: str) -> str | None:
+        self._check_model(model)
+        key = text_key(model, normalized_text)
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        tier = self._get_tier()
+        if tier is None:
+            return None
+        try:
+            value = tier.get(key)
+        except Exception:
+            return None
+        if value is not None:
+            self.persistent_hits += 1
+            self.memory.set(key, value)
+        return value
+
+    def set(self, model: str, normalized_text: str, value: str):
+        self._check_model(model)
+        key = text_key(model, normalized_text)
+        self.memory.set(key, value)
+        tier = self._get_tier()
+        if tier is not None:
+            try:
+                tier.set(key, model, value)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.memory.stats(), "backend": self.backend, "persistent_hits": self.persistent_hits}
+
+
+class AnalysisCache:
+    """Caches the model-derived part of an analysis (scores, label, model version) per text and model pair.
+
+    Each entry remembers how long the inference took, so hits can report saved time.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float | None):
+        self.memory: LRUCache[Tuple[Dict[str, float], str, float, str]] = LRUCache(max_size, ttl_seconds)
+        self.saved_seconds = 0.0
+
+    def get(self, key: str) -> Tuple[Dict[str, float], str, str] | None:
+        item = self.memory.get(key)
+        if item is None:
+            return None
+        scores, label, cost, version = item
+        self.saved_seconds += cost
+        return dict(scores), label, version
+
+    def set(self, key: str, scores: Dict[str, float], label: str, cost_seconds: float, version: str = ""):
+        self.memory.set(key, (dict(scores), label, cost_seconds, version))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.memory.stats(), "ttl_seconds": self.memory.ttl, "saved_inference_seconds": round(self.saved_seconds, 3)}
+
+
+translation_cache = TranslationCache(
+    max_size=settings.TRANSLATION_CACHE_SIZE,
+    backend=settings.TRANSLATION_CACHE_BACKEND,
+    path=settings.TRANSLATION_CACHE_PATH,
+)
+
+analysis_cache = AnalysisCache(
+    max_size=settings.ANALYSIS_CACHE_SIZE,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+)
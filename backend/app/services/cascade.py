@@ -0,0 +1,114 @@
+from typing import Any, Dict, List
+import json
+import math
+import os
+import re
+import threading
+
+_TOKEN = re.compile(r"\w+")
+
+
+def featurize(normalized_text: str) -> List[str]:
+    """Unigram + bigram terms over text already folded by `_normalize_tr_text`."""
+    tokens = _TOKEN.findall(normalized_text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class Tier1Model:
+    """TF-IDF + multinomial logistic regression, trained offline by scripts/train_tier1.py.
+
+    The JSON file holds `labels`, `bias` and a `vocab` of term -> [idf, weights per label];
+    scoring is a sparse dot product in pure Python, cheap enough to run on the event loop.
+    """
+
+    def __init__(self, labels: List[str], bias: List[float], vocab: Dict[str, List[Any]]):
+        self.labels = labels
+        self.bias = bias
+        self.vocab = vocab
+
+    @classmethod
+    def load(cls, path: str) -> "Tier1Model":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["labels"], data["bias"], data["vocab"])
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"labels": self.labels, "bias": self.bias, "vocab": self.vocab}, f, ensure_ascii=False)
+
+    def predict(self, normalized_text: str) -> Dict[str, float]:
+        counts: Dict[str, int] = {}
+        for term in featurize(normalized_text):
+            if term in self.vocab:
+                counts[term] = counts.get(term, 0) + 1
+        logits = list(self.bias)
+        if counts:
+            tfidf = {term: n * self.vocab[term][0] for term, n in counts.items()}
+            norm = math.sqrt(sum(v * v for v in tfidf.values())) or 1.0
+            for term, value in tfidf.items():
+                weights = self.vocab[term][1]
+                x = value / norm
+                for j in range(len(logits)):
+                    logits[j] += x * weights[j]
+        peak = max(logits)
+        exps = [math.exp(v - peak) for v in logits]
+        total = sum(exps)
+        return {label: e / total for label, e in zip(self.labels, exps)}
+
+
+class CascadeStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tier1 = 0
+        self.tier2 = 0
+        self.compared = 0
+        self.agreed = 0
+
+    def record(self, tier: int):
+        with self._lock:
+            if tier == 1:
+                self.tier1 += 1
+            else:
+                self.tier2 += 1
+
+    def compare(self, tier1_label: str, tier2_label: str):
+        with self._lock:
+            self.compared += 1
+            if tier1_label == tier2_label:
+                self.agreed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.tier1 + self.tier2
+        return {
+            "tier1": self.tier1,
+            "tier2": self.tier2,
+            "tier1_share": round(self.tier1 / total, 4) if total else 0.0,
+            "compared": self.compared,
+            "agreement": round(self.agreed / self.compared, 4) if self.compared else None,
+        }
+
+
+cascade_stats = CascadeStats()
+_model: Tier1Model | None = None
+_model_mtime: float | None = None
+
+
+def get_tier1_model(path: str) -> Tier1Model | None:
+    """Load (and reload when the file changes) the trained model; None if not trained yet."""
+    global _model, _model_mtime
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _model is None or mtime != _model_mtime:
+        try:
+            _model = Tier1Model.load(path)
+            _model_mtime = mtime
+        except (OSError, ValueError, KeyError):
+            return None
+    return _model
+
+
+def get_tier1_version() -> str:
+    return str(_model_mtime) if _model is not None else "keywords"
@@ -0,0 +1,25 @@
+from typing import List
+from app.schemas.crisis import CrisisResource
+
+
+def crisis_resources() -> List[CrisisResource]:
+    # Basic TR resources; user should localize further by region
+    return [
+        CrisisResource(
+            title="Acil Yardım",
+            description="Acil bir durumdaysanız 112’yi arayın.",
+            phone="112",
+        ),
+        CrisisResource(
+            title="ALO 183",
+            description="Sosyal destek hattı ve psikososyal destek için.",
+            phone="183",
+            url="https://www.aile.gov.tr/alo183/",
+        ),
+        CrisisResource(
+            title="Yeşilay Danışmanlık Merkezi (YEDAM)",
+            description="Bağımlılık ve psikolojik destek danışma hattı.",
+            phone="115",
+            url="https://yedam.org.tr/",
+        ),
+    ]
@@ -0,0 +1,110 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+import asyncio
+import functools
+from ..core.config import settings
+
+
+class InferenceBusyError(Exception):
+    pass
+
+
+def configure_torch_threads(num_threads: int | None):
+    """Pin torch intra-op threads so parallel workers do not oversubscribe the CPU."""
+    if not num_threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except Exception:
+        pass
+
+
+class InferenceExecutor:
+    """Runs blocking model calls on a dedicated pool with bounded concurrency.
+
+    At most `max_in_flight` calls execute at once; at most `max_queue` callers may wait
+    for a slot, beyond that `InferenceBusyError` is raised instead of queueing more work.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_in_flight: int, max_queue: int, torch_threads: int | None):
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.torch_threads = torch_threads
+        self._pool: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._waiting = 0
+        self._in_flight = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=configure_torch_threads,
+                    initargs=(self.torch_threads,),
+                )
+            else:
+                configure_torch_threads(self.torch_threads)
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nlp-inference")
+        return self._pool
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        return self._slots
+
+    async def acquire(self, bounded: bool = True):
+        if bounded and self._waiting >= self.max_queue and self._get_slots().locked():
+            raise InferenceBusyError("Inference queue is full")
+        self._waiting += 1
+        try:
+            await self._get_slots().acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+
+    def release(self):
+        self._in_flight -= 1
+        self._get_slots().release()
+
+    async def run_acquired(self, fn: Callable[..., Any], *args) -> Any:
+        """Run `fn` on the pool; the caller must already hold a slot from `acquire()`."""
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), functools.partial(fn, *args))
+        finally:
+            self.release()
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        await self.acquire()
+        return await self.run_acquired(fn, *args)
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+inference_executor = InferenceExecutor(
+    kind=settings.NLP_EXECUTOR,
+    max_workers=settings.NLP_EXECUTOR_WORKERS,
+    max_in_flight=settings.NLP_MAX_IN_FLIGHT,
+    max_queue=settings.NLP_MAX_QUEUE,
+    torch_threads=settings.NLP_TORCH_THREADS,
+)
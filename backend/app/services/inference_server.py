@@ -0,0 +1,230 @@
+from typing import Any, Dict, List, Tuple
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from ..core.config import settings
+from .inference import InferenceBusyError
+
+# Newline-delimited JSON over a Unix socket:
+#   request  {"id": 1, "op": "analyze" | "translate" | "ping", "texts": [...], "priority": bool}
+#   response {"id": 1, "result": [...], "version": "..."} or {"id": 1, "error": "...", "busy": bool}
+#   ("version" is the model version analyze results were scored with)
+STREAM_LIMIT = 16 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceServerUnavailable(Exception):
+    pass
+
+
+class InferenceClient:
+    """Async client for the shared inference server with timeouts and circuit breaking.
+
+    One multiplexed connection is shared by all requests of the worker. A connection
+    error raises InferenceServerUnavailable and keeps the client "open" for
+    `retry_seconds`, so callers fall back to in-process inference without paying a
+    connect attempt per request. A request that times out fails alone with
+    InferenceBusyError and leaves the connection and other requests untouched.
+    """
+
+    def __init__(self, socket_path: str, timeout_seconds: float, retry_seconds: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout_seconds
+        self.retry_seconds = retry_seconds
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock: asyncio.Lock | None = None
+        self._down_until = 0.0
+        self.remote_calls = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+        self.model_version = ""  # version the server last reported for its scores
+
+    async def _connect(self):
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        if time.monotonic() < self._down_until:
+            raise InferenceServerUnavailable("inference server marked down")
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT), self.timeout
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                self._mark_down()
+                raise InferenceServerUnavailable(str(e)) from e
+            self._reader_task = asyncio.get_running_loop().create_task(self._read_loop(self._reader))
+
+    def _mark_down(self):
+        self._down_until = time.monotonic() + self.retry_seconds
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        self._reader = None
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(InferenceServerUnavailable("connection lost"))
+        self._pending.clear()
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = json.loads(line)
+                fut = self._pending.pop(msg.get("id"), None)
+                if fut is None or fut.done():
+                    continue
+                if msg.get("busy"):
+                    fut.set_exception(InferenceBusyError(msg.get("error") or "Inference queue is full"))
+                elif "error" in msg:
+                    fut.set_exception(InferenceServerUnavailable(msg["error"]))
+                else:
+                    fut.set_result(msg)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            pass
+        self._mark_down()
+
+    async def call(self, op: str, texts: List[str], priority: bool = False) -> Dict[str, Any]:
+        """Send one request; returns the whole response message."""
+        await self._connect()
+        assert self._writer is not None
+        req_id = next(self._ids)
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = fut
+        try:
+            payload = {"id": req_id, "op": op, "texts": texts, "priority": priority}
+            self._writer.write(json.dumps(payload).encode("utf-8") + b"\n")
+            await self._writer.drain()
+        except OSError as e:
+            self._pending.pop(req_id, None)
+            self._mark_down()
+            raise InferenceServerUnavailable(str(e)) from e
+        try:
+            result = await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError as e:
+            # a slow request is not a dead server: fail only this call (its late reply is
+            # dropped by the read loop), keep the connection and do not fall back to local models
+            self._pending.pop(req_id, None)
+            self.timeouts += 1
+            raise InferenceBusyError(f"Inference server did not answer within {self.timeout}s") from e
+        self.remote_calls += 1
+        return result
+
+    async def analyze(self, texts: List[str], priority: bool = False) -> Tuple[List[Dict[str, float]], str]:
+        """Scores plus the model version the server scored them with."""
+        reply = await self.call("analyze", texts, priority=priority)
+        self.model_version = reply.get("version") or self.model_version
+        return reply.get("result"), self.model_version
+
+    async def ping(self) -> bool:
+        return bool((await self.call("ping", [])).get("result"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "socket": self.socket_path,
+            "connected": self._writer is not None and not self._writer.is_closing(),
+            "remote_calls": self.remote_calls,
+            "fallbacks": self.fallbacks,
+            "timeouts": self.timeouts,
+            "model_version": self.model_version or None,
+        }
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    from . import nlp
+
+    write_lock = asyncio.Lock()
+
+    async def respond(req: Dict[str, Any]):
+        reply: Dict[str, Any] = {"id": req.get("id")}
+        try:
+            op = req.get("op")
+            texts = [str(t) for t in req.get("texts") or []]
+            if op == "analyze":
+                # stamped by the workers on stored scores, so it must be this process's view
+                reply["version"] = nlp.model_version()
+            if op == "analyze" and len(texts) > settings.NLP_BATCH_MAX_SIZE:
+                # bulk callers already form their own batches
+                reply["result"] = await nlp.analyze_on_executor(texts)
+            elif op == "analyze":
+                # per-text submits share the server's micro-batcher across all API workers
+                priority = bool(req.get("priority"))
+                reply["result"] = list(await asyncio.gather(*(nlp.analyze_text_local(t, priority=priority) for t in texts)))
+            elif op == "translate":
+                reply["result"] = await nlp.inference_executor.run(nlp.translate_tr_en_batch, texts)
+            elif op == "ping":
+                reply["result"] = True
+            else:
+                reply["error"] = f"unknown op {op!r}"
+        except InferenceBusyError as e:
+            reply.update(error=str(e), busy=True)
+        except Exception as e:
+            reply["error"] = str(e)
+        async with write_lock:
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            asyncio.get_running_loop().create_task(respond(json.loads(line)))
+    except (OSError, ValueError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: str):
+    from . import nlp
+    from ..db.mongodb import connect_to_mongo
+
+    # lexicons bias the scores, so the server keeps the same ones as the API workers
+    try:
+        await connect_to_mongo()
+        asyncio.get_running_loop().create_task(nlp.lexicon_reload_loop(settings.LEXICON_RELOAD_SECONDS or 300))
+    except Exception:
+        pass
+    # the server owns the weights, so hot swaps from the registry are loaded here;
+    # pick up the desired versions before warming so warm-up loads the right ones
+    try:
+        await nlp.sync_model_registry(server=True)
+    except Exception:
+        pass
+    if settings.MODEL_REGISTRY_POLL_SECONDS > 0:
+        asyncio.get_running_loop().create_task(nlp.model_registry_loop(settings.MODEL_REGISTRY_POLL_SECONDS, server=True))
+    if settings.MT_IDLE_UNLOAD_SECONDS > 0:
+        asyncio.get_running_loop().create_task(nlp.model_idle_loop(settings.MT_IDLE_UNLOAD_SECONDS))
+    await nlp.warm_up_local()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(_handle, path=socket_path, limit=STREAM_LIMIT)
+    logger.info("Inference server listening on %s (warm-up: %s)", socket_path, nlp.warmup_state["status"])
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(serve(settings.NLP_SERVER_SOCKET or "/tmp/mental-health-nlp.sock"))
@@ -0,0 +1,81 @@
+from typing import Dict, Set
+import re
+
+# Letters that only occur in Turkish among the languages we see
+TURKISH_CHARS: Set[str] = set("çğışöüÇĞİŞÖÜ")
+
+TURKISH_WORDS: Set[str] = {
+    "ve", "bir", "bu", "şu", "çok", "cok", "ben", "sen", "biz", "değil", "degil", "için", "icin", "gibi", "ama",
+    "daha", "şey", "sey", "mi", "mı", "mu", "mü", "ne", "var", "yok", "de", "da", "ki", "bugün", "bugun",
+    "hiç", "hic", "her", "kadar", "sonra", "önce", "once", "gün", "gun", "neden", "nasıl", "nasil", "iyi",
+    "kötü", "kotu", "biraz", "artık", "artik", "hep", "beni", "bana", "benim",
+}
+
+ENGLISH_WORDS: Set[str] = {
+    "the", "and", "i", "you", "is", "am", "are", "was", "a", "an", "to", "of", "in", "it", "that", "this",
+    "feel", "feeling", "but", "not", "my", "me", "so", "today", "very", "with", "for", "have", "be", "just",
+    "really", "what", "about", "like", "im", "i'm", "don't", "dont", "can't", "cant", "bit", "because",
+}
+
+# Frequent character trigrams, weighted roughly by how distinctive they are
+TURKISH_TRIGRAMS: Dict[str, float] = {
+    "lar": 1.0, "ler": 1.0, "yor": 1.5, "iyo": 1.2, "uyo": 1.2, "ını": 1.0, "ini": 0.6, "mak": 0.8,
+    "mek": 0.8, "yım": 1.2, "yim": 1.0, "dım": 1.0, "dim": 0.6, "sin": 0.4, "miy": 1.0, "ğım": 1.2,
+    "lum": 0.8, "lim": 0.8, "nım": 1.0, "num": 0.8, "ece": 0.6,
+}
+ENGLISH_TRIGRAMS: Dict[str, float] = {
+    "the": 1.5, "ing": 1.2, "and": 1.0, "ion": 0.8, "ent": 0.5, "tha": 1.0, "hat": 0.6, "ght": 1.2,
+    "you": 1.0, "ful": 0.6, "eel": 0.8, "ous": 0.8, "wha": 1.0, "ver": 0.4,
+}
+
+_TOKEN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+# Per-route traffic split, reported at /metrics/nlp
+route_counts: Dict[str, int] = {"en_direct": 0, "translated": 0}
+
+
+def _trigram_score(token: str, table: Dict[str, float]) -> float:
+    return sum(table.get(token[i:i + 3], 0.0) for i in range(len(token) - 2))
+
+
+def detect_language(text: str) -> str:
+    """Cheap in-process language guess: "tr", "en", "mixed" or "unknown".
+
+    Turkish-only letters are decisive for Turkish; otherwise stopwords and a small
+    character-trigram profile decide. Only a clear English verdict skips translation.
+    """
+    tokens = [t.lower() for t in _TOKEN.findall(text)]
+    if not tokens:
+        return "unknown"
+    tr = 0.0
+    en = 0.0
+    for tok in tokens:
+        if any(c in TURKISH_CHARS for c in tok):
+            tr += 3.0
+        if tok in TURKISH_WORDS:
+            tr += 2.0
+        if tok in ENGLISH_WORDS:
+            en += 2.0
+        tr += _trigram_score(tok, TURKISH_TRIGRAMS)
+        en += _trigram_score(tok, ENGLISH_TRIGRAMS)
+    if tr == 0.0 and en == 0.0:
+        return "unknown"
+    if en >= 2 * tr and en >= 2.0:
+        return "en"
+    if tr >= 2 * en:
+        return "tr"
+    return "mixed"
+
+
+def needs_translation(text: str) -> bool:
+    needed = detect_language(text) != "en"
+    route_counts["translated" if needed else "en_direct"] += 1
+    return needed
+
+
+def stats() -> Dict[str, object]:
+    total = sum(route_counts.values())
+    return {
+        **route_counts,
+        "en_direct_share": round(route_counts["en_direct"] / total, 4) if total else 0.0,
+    }
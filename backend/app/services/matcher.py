@@ -0,0 +1,132 @@
+from typing import Callable, Dict, List, NamedTuple, Set, Tuple
+import re
+
+
+class LexiconHit(NamedTuple):
+    kind: str  # "emotion" or "crisis"
+    label: str  # emotion label, or crisis reason for crisis hits
+    start: int  # offsets into the normalized text
+    end: int
+    text: str
+
+
+# Constructs that compile on their own but not inside the combined alternation: global inline
+# flags (must lead the whole regex), named groups (clash with c<i>/kw), and references to group
+# names or numbers (these would point at another alternative's groups)
+_UNSAFE_CRISIS = re.compile(r"\(\?[aiLmsux]+\)|\(\?P[<=]|\(\?\(|\\[1-9]|\\g<")
+
+
+def _is_literal(pattern: str) -> bool:
+    return re.escape(pattern).replace("\\ ", " ") == pattern
+
+
+def crisis_pattern_error(
+    pattern: str, fold: Callable[[str], str], normalize: Callable[[str], str], example: str | None = None
+) -> str | None:
+    """Why `pattern` cannot be one alternative of the combined crisis scan, or None if it can.
+
+    The folded pattern must also find `example` (a literal pattern is its own example) in
+    the normalized text the scan runs on.
+    """
+    folded = fold(pattern)
+    if _UNSAFE_CRISIS.search(folded):
+        return "inline flags, named groups and backreferences are not supported"
+    try:
+        # alone first: a fragment like "a)(" only compiles by unbalancing the alternation
+        re.compile(folded, re.I)
+        re.compile(f"(?=(?P<c0>{folded})|(?P<kw>x))", re.I)
+    except re.error as e:
+        return str(e)
+    if example is None and _is_literal(pattern):
+        example = pattern
+    if example is not None and not re.search(folded, normalize(example), re.I):
+        return f"does not match its example {example!r} after normalization"
+    return None
+
+
+class LexiconMatcher:
+    """Precompiled keyword + crisis matcher over diacritic-folded text.
+
+    All keywords and crisis patterns are folded once and compiled into a single
+    lookahead alternation, so `scan` reports every hit (including overlapping ones)
+    with one regex pass over the normalized text instead of one `in` check per keyword.
+    """
+
+    def __init__(
+        self,
+        keywords: Dict[str, List[str]],
+        crisis: List[Tuple[re.Pattern, str]],
+        normalize: Callable[[str], str],
+        fold: Callable[[str], str],
+    ):
+        self._normalize = normalize
+        # label priority follows lexicon order (first label wins in keyword_emotion)
+        self.label_order: Dict[str, int] = {label: i for i, label in enumerate(keywords)}
+
+        word_labels: Dict[str, Set[str]] = {}
+        for label, words in keywords.items():
+            for w in words:
+                folded = fold(w.lower())
+                if folded:
+                    word_labels.setdefault(folded, set()).add(label)
+        # the regex reports only the longest keyword per start position; give it the
+        # labels of every keyword that is a prefix of it so no hit is lost
+        self._word_labels: Dict[str, List[str]] = {}
+        for word in word_labels:
+            labels: Set[str] = set()
+            for other, other_labels in word_labels.items():
+                if word.startswith(other):
+                    labels |= other_labels
+            self._word_labels[word] = sorted(labels, key=self.label_order.__getitem__)
+
+        words_alt = "|".join(re.escape(w) for w in sorted(self._word_labels, key=len, reverse=True))
+        self._crisis_reasons: List[str] = []
+        crisis_alts: List[str] = []
+        for i, (pat, reason) in enumerate(crisis):
+            crisis_alts.append(f"(?P<c{i}>{fold(pat.pattern)})")
+            self._crisis_reasons.append(reason)
+
+        # crisis alternatives come first so they are never shadowed by a keyword
+        alts = crisis_alts + ([f"(?P<kw>{words_alt})"] if words_alt else [])
+        self._scan_re = re.compile("(?=" + "|".join(alts) + ")", re.I) if alts else None
+        self._kw_re = re.compile(f"(?P<kw>{words_alt})", re.I) if words_alt else None
+
+    def _keyword_hits(self, m: re.Match, start: int) -> List[LexiconHit]:
+        word = m.group("kw")
+        return [LexiconHit("emotion", label, start, start + len(word), word) for label in self._word_labels[word.lower()]]
+
+    def scan(self, text: str) -> List[LexiconHit]:
+        """Every emotion-keyword and crisis hit in `text`, in order of position."""
+        if self._scan_re is None:
+            return []
+        t = self._normalize(text)
+        hits: List[LexiconHit] = []
+        for m in self._scan_re.finditer(t):
+            start = m.start()
+            if self._kw_re is not None and m.group("kw") is not None:
+                hits.extend(self._keyword_hits(m, start))
+                continue
+            for i, reason in enumerate(self._crisis_reasons):
+                phrase = m.group(f"c{i}")
+                if phrase is not None:
+                    hits.append(LexiconHit("crisis", reason, start, start + len(phrase), phrase))
+                    break
+            # a keyword starting at the same offset was shadowed by the crisis branch
+            if self._kw_re is not None:
+                km = self._kw_re.match(t, start)
+                if km is not None:
+                    hits.extend(self._keyword_hits(km, start))
+        return hits
+
+    def keyword_emotion(self, hits: List[LexiconHit]) -> str | None:
+        labels = [h.label for h in hits if h.kind == "emotion"]
+        if not labels:
+            return None
+        return min(labels, key=self.label_order.__getitem__)
+
+    @staticmethod
+    def crisis(hits: List[LexiconHit]) -> Tuple[bool, str | None]:
+        for h in hits:
+            if h.kind == "crisis":
+                return True, h.label
+        return False, None
@@ -0,0 +1,172 @@
+from typing import Any, Callable, Dict, List
+import gc
+import os
+import threading
+import time
+
+
+def weights_bytes(model: Any) -> int:
+    """Bytes held by a model's weights: torch parameters/buffers, or the ONNX files it runs from."""
+    if hasattr(model, "parameters"):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    path = getattr(model, "model_save_dir", None)
+    if path and os.path.isdir(str(path)):
+        return sum(
+            os.path.getsize(os.path.join(str(path), f)) for f in os.listdir(str(path)) if f.endswith((".onnx", ".onnx_data"))
+        )
+    return 0
+
+
+class ManagedModel:
+    def __init__(self, name: str, loader: Callable[[str], Any], model_of: Callable[[Any], Any], version: str, idle_seconds: float):
+        self.name = name
+        self.loader = loader  # version -> loaded value
+        self.model_of = model_of
+        self.version = version  # empty = disabled
+        self.idle_seconds = idle_seconds
+        self.value: Any = None
+        self.size = 0  # bytes of the last load, kept after unloading to plan the next one
+        self.last_used = 0.0
+        self.loads = 0
+        self.unloads = 0
+        self.swaps = 0
+        self.load_seconds = 0.0
+        self.lock = threading.Lock()
+
+
+class ModelManager:
+    """Owns the NLP model singletons: loads on first use, unloads idle ones, keeps a memory budget.
+
+    A model with `idle_seconds > 0` is dropped once unused for that long and reloaded
+    transparently on the next `get`. Before and after each load, least recently used models
+    are evicted until the resident weights fit `budget_mb`; callers already holding a model
+    keep working with it, the memory is released when they let go. `swap` replaces a model
+    with another version the same way: requests in flight finish on the old one.
+    """
+
+    def __init__(self, budget_mb: float | None = None):
+        self.budget = int(budget_mb * 1024 * 1024) if budget_mb else None
+        self._models: Dict[str, ManagedModel] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def register(
+        self, name: str, loader: Callable[[str], Any], model_of: Callable[[Any], Any], version: str, idle_seconds: float = 0
+    ):
+        self._models[name] = ManagedModel(name, loader, model_of, version, idle_seconds)
+
+    def version(self, name: str) -> str:
+        return self._models[name].version
+
+    def get(self, name: str) -> Any:
+        entry = self._models[name]
+        entry.last_used = time.monotonic()
+        value = entry.value
+        if value is not None:
+            return value
+        with entry.lock:
+            if entry.value is None:
+                if not entry.version:
+                    raise LookupError(f"Model {name!r} is disabled")
+                self._make_room(entry, entry.size)
+                value, entry.size, entry.load_seconds = self._load(entry, entry.version)
+                entry.value = value
+                entry.loads += 1
+                self._make_room(entry, 0)
+            entry.last_used = time.monotonic()
+            return entry.value
+
+    def _load(self, entry: ManagedModel, version: str):
+        started = time.perf_counter()
+        value = entry.loader(version)
+        return value, weights_bytes(entry.model_of(value)), time.perf_counter() - started
+
+    def swap(self, name: str, version: str, load: bool | None = None):
+        """Switch `name` to `version`; blocking, run it off the event loop.
+
+        The new version is loaded before the swap (`load=None` loads only if the current one
+        is resident, otherwise the next `get` loads it); an empty version disables the model.
+        A failed load raises and leaves the current version in place.
+        """
+        entry = self._models[name]
+        if version == entry.version:
+            return
+        if load is None:
+            load = entry.value is not None
+        loaded = self._load(entry, version) if load and version else None
+        with entry.lock:
+            old = entry.value
+            entry.version = version
+            entry.value = loaded[0] if loaded else None
+            entry.size = loaded[1] if loaded else 0
+            if loaded:
+                entry.load_seconds = loaded[2]
+                entry.loads += 1
+                entry.last_used = time.monotonic()
+            entry.swaps += 1
+        if old is not None:
+            entry.unloads += 1
+            del old
+            gc.collect()
+        if loaded:
+            self._make_room(entry, 0)
+
+    def resident_bytes(self) -> int:
+        return sum(m.size for m in self._models.values() if m.value is not None)
+
+    def _make_room(self, keep: ManagedModel, incoming: int):
+        if self.budget is None:
+            return
+        with self._lock:
+            others = sorted(
+                (m for m in self._models.values() if m is not keep and m.value is not None), key=lambda m: m.last_used
+            )
+            while others and self.resident_bytes() + incoming > self.budget:
+                self._unload(others.pop(0))
+                self.evictions += 1
+
+    def _unload(self, entry: ManagedModel):
+        if entry.value is None:
+            return
+        entry.value = None
+        entry.unloads += 1
+        # HF models hold reference cycles; collect now so the weights are actually freed
+        gc.collect()
+
+    def unload(self, name: str):
+        with self._lock:
+            self._unload(self._models[name])
+
+    def evict_idle(self) -> List[str]:
+        """Unload models idle for longer than their timeout; returns their names."""
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            for entry in self._models.values():
+                if entry.value is not None and entry.idle_seconds > 0 and now - entry.last_used >= entry.idle_seconds:
+                    self._unload(entry)
+                    evicted.append(entry.name)
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "budget_mb": round(self.budget / 1024 / 1024, 1) if self.budget else None,
+            "resident_mb": round(self.resident_bytes() / 1024 / 1024, 1),
+            "evictions": self.evictions,
+            "models": {
+                m.name: {
+                    "version": m.version or None,
+                    "loaded": m.value is not None,
+                    "resident_mb": round(m.size / 1024 / 1024, 1) if m.value is not None else 0.0,
+                    "idle_seconds": round(now - m.last_used, 1) if m.last_used else None,
+                    "idle_unload_seconds": m.idle_seconds or None,
+                    "loads": m.loads,
+                    "unloads": m.unloads,
+                    "swaps": m.swaps,
+                    "last_load_seconds": round(m.load_seconds, 3),
+                }
+                for m in self._models.values()
+            },
+        }
@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import Any, Dict, Tuple
+import asyncio
+import logging
+import random
+import threading
+from .model_manager import ModelManager
+
+logger = logging.getLogger(__name__)
+
+# Roles the registry may swap; "shadow_classifier" is empty unless shadow evaluation is on
+ROLES = ("classifier", "translator", "shadow_classifier")
+
+
+class ShadowStats:
+    """Latency and label deltas between the active and the shadow classifier on sampled traffic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.compared = 0
+        self.agreed = 0
+        self.skipped = 0
+        self.errors = 0
+        self.primary_seconds = 0.0
+        self.shadow_seconds = 0.0
+        self.max_score_delta = 0.0
+        self.score_delta_sum = 0.0
+
+    def record(self, primary_seconds: float, shadow_seconds: float, primary_label: str, shadow_label: str, score_delta: float):
+        with self._lock:
+            self.compared += 1
+            self.agreed += primary_label == shadow_label
+            self.primary_seconds += primary_seconds
+            self.shadow_seconds += shadow_seconds
+            self.score_delta_sum += score_delta
+            self.max_score_delta = max(self.max_score_delta, score_delta)
+
+    def stats(self) -> Dict[str, Any]:
+        n = self.compared
+        return {
+            "compared": n,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "label_agreement": round(self.agreed / n, 4) if n else None,
+            "primary_ms": round(self.primary_seconds / n * 1000, 1) if n else None,
+            "shadow_ms": round(self.shadow_seconds / n * 1000, 1) if n else None,
+            "mean_score_delta": round(self.score_delta_sum / n, 4) if n else None,
+            "max_score_delta": round(self.max_score_delta, 4),
+        }
+
+
+class ModelRegistry:
+    """Desired model versions per role, applied to the model manager without dropping requests.
+
+    The desired state is a document `{classifier, translator, shadow_classifier, shadow_rate}`
+    (missing keys keep the configured defaults). New versions are loaded in a background
+    thread and only swapped in once they loaded, so a bad version never reaches the request
+    path; a version that fails to load is remembered and not retried until the desired state
+    changes. `lazy_roles` (models this process never uses) only record the version.
+    """
+
+    def __init__(self, manager: ModelManager, defaults: Dict[str, str], shadow_rate: float, lazy_roles: Tuple[str, ...] = ()):
+        self.manager = manager
+        self.defaults = defaults
+        self.lazy_roles = lazy_roles
+        self.default_shadow_rate = shadow_rate
+        self.shadow_rate = shadow_rate
+        self.shadow = ShadowStats()
+        self.failed: Dict[str, str] = {}
+        self.synced_at: datetime | None = None
+        self._lock: asyncio.Lock | None = None
+
+    def desired(self, doc: Dict[str, Any] | None) -> Dict[str, str]:
+        doc = doc or {}
+        versions: Dict[str, str] = {}
+        for role in ROLES:
+            if role == "shadow_classifier" and role in doc:
+                # an explicit null turns shadow evaluation off even if configured
+                versions[role] = doc[role] or ""
+            else:
+                versions[role] = doc.get(role) or self.defaults.get(role, "")
+        return versions
+
+    async def apply(self, doc: Dict[str, Any] | None, load_shadow: bool = True) -> Dict[str, str]:
+        """Move every role to its desired version; returns the roles that changed."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        changed: Dict[str, str] = {}
+        async with self._lock:
+            for role, version in self.desired(doc).items():
+                if version == self.manager.version(role) or self.failed.get(role) == version:
+                    continue
+                # validate by loading before the swap; the shadow is loaded up front so sampling never waits on it
+                if role == "shadow_classifier":
+                    load = load_shadow
+                else:
+                    load = role not in self.lazy_roles
+                try:
+                    await asyncio.to_thread(self.manager.swap, role, version, load)
+                except Exception:
+                    self.failed[role] = version
+                    logger.exception("Model registry: loading %s=%r failed", role, version)
+                    continue
+                self.failed.pop(role, None)
+                changed[role] = version
+                if role == "shadow_classifier":
+                    self.shadow.reset()
+            rate = (doc or {}).get("shadow_rate")
+            self.shadow_rate = min(1.0, max(0.0, float(rate))) if rate is not None else self.default_shadow_rate
+            self.synced_at = datetime.utcnow()
+        return changed
+
+    def sample_shadow(self) -> bool:
+        return bool(self.manager.version("shadow_classifier")) and random.random() < self.shadow_rate
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "active": {role: self.manager.version(role) or None for role in ROLES},
+            "shadow_rate": self.shadow_rate,
+            "failed": dict(self.failed),
+            "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+            "shadow": self.shadow.stats(),
+        }
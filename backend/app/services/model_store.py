@@ -0,0 +1,48 @@
+# Local model snapshots. scripts/snapshot_models.py saves HF_MODEL_NAME and HF_TR_EN_MODEL as
+# safetensors under MODEL_SNAPSHOT_DIR/<model>; when a snapshot exists the models are loaded
+# from it offline, with the weight files memory-mapped instead of read into private memory.
+from typing import Any, Dict, NamedTuple
+import os
+from ..core.config import settings
+
+MANIFEST = "snapshot.json"
+
+
+class ModelSnapshotMissing(Exception):
+    pass
+
+
+class ModelSource(NamedTuple):
+    name: str  # hub model id
+    path: str  # what to pass to from_pretrained
+    local: bool
+
+    @property
+    def tokenizer_kwargs(self) -> Dict[str, Any]:
+        return {"local_files_only": True} if self.local else {}
+
+    @property
+    def model_kwargs(self) -> Dict[str, Any]:
+        if not self.local:
+            return {}
+        # safetensors are opened with mmap; skipping the random init avoids a second full copy
+        return {"local_files_only": True, "use_safetensors": True, "low_cpu_mem_usage": True}
+
+
+def snapshot_dir(model_name: str, root: str | None = None) -> str:
+    return os.path.join(os.path.abspath(root or settings.MODEL_SNAPSHOT_DIR), model_name.replace("/", "__"))
+
+
+def has_snapshot(model_name: str, root: str | None = None) -> bool:
+    return os.path.exists(os.path.join(snapshot_dir(model_name, root), MANIFEST))
+
+
+def model_source(model_name: str) -> ModelSource:
+    """Local snapshot of `model_name` when provisioned, otherwise the hub id."""
+    if settings.MODEL_SNAPSHOT_DIR and has_snapshot(model_name):
+        return ModelSource(model_name, snapshot_dir(model_name), True)
+    if settings.MODEL_SNAPSHOT_REQUIRED:
+        raise ModelSnapshotMissing(
+            f"No snapshot of {model_name} in {settings.MODEL_SNAPSHOT_DIR}; run scripts/snapshot_models.py"
+        )
+    return ModelSource(model_name, model_name, False)
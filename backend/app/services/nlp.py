@@ -1,8 +1,26 @@
-from typing import Dict, List, TypedDict, Tuple
+from typing import Awaitable, Callable, Dict, List, TypedDict, Tuple
+import asyncio
+import itertools
+import logging
+import random
 import re
+import time
 import unicodedata
 from ..core.config import settings
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline, MarianMTModel, MarianTokenizer
+from .inference import InferenceBusyError, InferenceExecutor, inference_executor
+from .cache import analysis_cache, text_key, translation_cache
+from .onnx_backend import load_classifier as load_onnx_classifier, load_translator as load_onnx_translator
+from .matcher import LexiconHit, LexiconMatcher, crisis_pattern_error
+from .model_store import model_source
+from .model_manager import ModelManager
+from .model_registry import ModelRegistry
+from . import langid
+from .inference_server import InferenceClient, InferenceServerUnavailable
+from .cascade import cascade_stats, get_tier1_model, get_tier1_version
+from .admission import AdmissionController
+from ..db.mongodb import lexicons_collection, model_registry_collection
+
+logger = logging.getLogger(__name__)
 
 # Types for pipeline output
 class LabelScore(TypedDict):
@@ -28,110 +46,904 @@ EMOTION_KEYWORDS: Dict[str, List[str]] = {
 CRISIS_PATTERNS: List[re.Pattern] = [
     re.compile(r"intihar|kendimi\s*öldür|yasamak\s*istemiyorum|yaşamak\s*istemiyorum|kendime\s*zarar|bıçaklayacağım|atlayacağım", re.I),
 ]
+CRISIS_REASON = "Kriz ifadesi tespit edildi"
+
+
+
+def _dtype_kwargs() -> Dict[str, object]:
+    if settings.NLP_TORCH_DTYPE in ("", "float32"):
+        return {}
+    import torch
+
+    return {"torch_dtype": getattr(torch, settings.NLP_TORCH_DTYPE)}
+
+
+def build_classifier_pipeline(backend: str, model_name: str | None = None):
+    """Text-classification pipeline for `model_name` (default HF_MODEL_NAME) on the given backend ("torch" or "onnx")."""
+    # transformers (and torch) are imported on first model load, not when the app boots
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+
+    source = model_source(model_name or settings.HF_MODEL_NAME)
+    tokenizer = AutoTokenizer.from_pretrained(source.path, **source.tokenizer_kwargs)
+    if backend == "onnx":
+        model, _ = load_onnx_classifier(source.name, quantize=settings.ONNX_QUANTIZE, source=source.path)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(source.path, **source.model_kwargs, **_dtype_kwargs())
+    pipe = pipeline(
+        task="text-classification",
+        model=model,
+        tokenizer=tokenizer,
+        return_all_scores=True,
+    )
+    return tokenizer, model, pipe
+
+
+def build_translation_model(backend: str, model_name: str | None = None):
+    """TR->EN MarianMT tokenizer and model for `model_name` (default HF_TR_EN_MODEL) on the given backend."""
+    from transformers import MarianMTModel, MarianTokenizer
+
+    source = model_source(model_name or settings.HF_TR_EN_MODEL)
+    tokenizer = MarianTokenizer.from_pretrained(source.path, **source.tokenizer_kwargs)
+    if backend == "onnx":
+        model, _ = load_onnx_translator(source.name, quantize=settings.ONNX_QUANTIZE, source=source.path)
+    else:
+        model = MarianMTModel.from_pretrained(source.path, **source.model_kwargs, **_dtype_kwargs())
+    return tokenizer, model
 
-# Global singletons
-_tokenizer = None
-_model = None
-_pipeline = None
-_mt_tokenizer = None
-_mt_model = None
-_mt_pipe = None
+
+# The model manager owns the singletons: loaded on first use, the translator unloaded when idle
+models = ModelManager(budget_mb=settings.NLP_MEMORY_BUDGET_MB)
+models.register(
+    "classifier",
+    lambda version: build_classifier_pipeline(settings.NLP_BACKEND, version),
+    model_of=lambda v: v[1],
+    version=settings.HF_MODEL_NAME,
+)
+models.register(
+    "translator",
+    lambda version: build_translation_model(settings.NLP_BACKEND, version),
+    model_of=lambda v: v[1],
+    version=settings.HF_TR_EN_MODEL,
+    idle_seconds=settings.MT_IDLE_UNLOAD_SECONDS,
+)
+models.register(
+    "shadow_classifier",
+    lambda version: build_classifier_pipeline(settings.NLP_BACKEND, version),
+    model_of=lambda v: v[1],
+    version="",  # set by the registry while shadow evaluation runs
+)
+
+# Hot-swappable versions, desired state in the `model_registry` collection
+registry = ModelRegistry(
+    models,
+    defaults={"classifier": settings.HF_MODEL_NAME, "translator": settings.HF_TR_EN_MODEL, "shadow_classifier": settings.SHADOW_CLASSIFIER or ""},
+    shadow_rate=settings.SHADOW_RATE,
+    lazy_roles=() if settings.USE_TR_EN_TRANSLATION else ("translator",),
+)
 
 
 def get_pipeline():
-    global _tokenizer, _model, _pipeline
-    if _pipeline is None:
-        model_name = settings.HF_MODEL_NAME
-        _tokenizer = AutoTokenizer.from_pretrained(model_name)
-        _model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        _pipeline = pipeline(
-            task="text-classification",
-            model=_model,
-            tokenizer=_tokenizer,
-            return_all_scores=True,
-        )
-    return _pipeline
+    return models.get("classifier")[2]
 
 
-def get_mt_pipeline():
-    global _mt_tokenizer, _mt_model, _mt_pipe
+def get_mt_model():
+    """(tokenizer, model) for TR->EN translation, or None when translation is disabled."""
     if not settings.USE_TR_EN_TRANSLATION:
         return None
-    if _mt_pipe is None:
-        mt_name = settings.HF_TR_EN_MODEL
-        _mt_tokenizer = MarianTokenizer.from_pretrained(mt_name)
-        _mt_model = MarianMTModel.from_pretrained(mt_name)
-        _mt_pipe = pipeline("translation", model=_mt_model, tokenizer=_mt_tokenizer, src_lang="tr", tgt_lang="en")
-    return _mt_pipe
+    return models.get("translator")
 
 
-def translate_tr_en(text: str) -> str:
-    pipe = get_mt_pipeline()
-    if pipe is None:
-        return text
+def model_version() -> str:
+    """Version stamped on stored scores: active classifier, plus the translator when enabled."""
+    version = models.version("classifier")
+    if settings.USE_TR_EN_TRANSLATION:
+        version += f"|{models.version('translator')}"
+    return version
+
+
+KEYWORD_VERSION = "keywords"
+
+
+# Pool processes hold their own module state: the reloaded lexicons and registry swaps live
+# only in this process, so with a process pool the children score with the configured models
+# and the keyword bias is applied back here.
+PROCESS_POOL = settings.NLP_EXECUTOR == "process"
+
+
+class RegistryUnsupported(Exception):
+    pass
+
+
+def check_registry_supported():
+    if PROCESS_POOL:
+        # a swap here would stamp versions the pool processes never loaded
+        raise RegistryUnsupported("Model hot swap and shadow evaluation are not available with NLP_EXECUTOR=process")
+
+
+async def sync_model_registry(server: bool = False) -> Dict[str, str]:
+    """Apply the desired versions from the `model_registry` collection; returns what changed.
+
+    `server` is set by the inference server, which owns the weights. API workers that score
+    through it apply nothing: they stamp the version the server reports, and their local
+    fallback keeps the configured models. With a process pool nothing is applied either.
+    """
+    if PROCESS_POOL or (inference_client is not None and not server):
+        return {}
+    doc = await model_registry_collection().find_one({"_id": "active"})
+    return await registry.apply(doc)
+
+
+async def model_registry_loop(interval_seconds: float, server: bool = False):
+    while True:
+        try:
+            await sync_model_registry(server=server)
+        except Exception:
+            # keep serving the current versions
+            logger.exception("Model registry sync failed")
+        await asyncio.sleep(interval_seconds)
+
+
+async def model_idle_loop(idle_seconds: float):
+    interval_seconds = max(1.0, min(60.0, idle_seconds / 4))
+    while True:
+        await asyncio.sleep(interval_seconds)
+        models.evict_idle()
+
+
+def run_bucketed(pipe, inputs: List[str], batch_size: int, **kwargs) -> List:
+    """Run `pipe` over inputs sorted by length so each padded batch holds similar lengths.
+
+    Outputs come back in the original order.
+    """
+    order = sorted(range(len(inputs)), key=lambda i: len(inputs[i]))
+    out = pipe([inputs[i] for i in order], batch_size=max(1, batch_size), **kwargs)
+    results: List = [None] * len(inputs)
+    for pos, i in enumerate(order):
+        results[i] = out[pos]
+    return results
+
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+def split_chunks(text: str, max_chars: int) -> List[str]:
+    """Split long text into sentence-aligned chunks of at most `max_chars` characters.
+
+    Short text is returned as a single chunk; a run-on sentence is cut at whitespace.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    chunks: List[str] = []
+    current = ""
+    for sentence in (s.strip() for s in _SENTENCE_BREAK.split(text)):
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks or [text]
+
+
+def decode_budget(source_tokens: int) -> int:
+    """Max new tokens for a source of `source_tokens` tokens (TR->EN output is rarely longer)."""
+    budget = int(source_tokens * settings.TRANSLATION_LENGTH_RATIO) + settings.TRANSLATION_LENGTH_OFFSET
+    return max(1, min(settings.TRANSLATION_MAX_LENGTH, budget))
+
+
+def generate_translations(tokenizer, model, texts: List[str], batch_size: int, num_beams: int | None = None) -> List[str]:
+    """Translate texts with batched `generate` calls over length-sorted token ids.
+
+    Each batch stops at a decode budget derived from its longest source instead of a flat
+    512 tokens, and reuses the decoder KV cache between steps. Outputs keep input order.
+    """
+    beams = settings.TRANSLATION_NUM_BEAMS if num_beams is None else num_beams
+    ids = tokenizer(texts, truncation=True, max_length=settings.TRANSLATION_MAX_LENGTH)["input_ids"]
+    order = sorted(range(len(texts)), key=lambda i: len(ids[i]))
+    results: List[str] = [""] * len(texts)
+    step = max(1, batch_size)
+    for start in range(0, len(order), step):
+        group = order[start:start + step]
+        enc = tokenizer.pad({"input_ids": [ids[i] for i in group]}, return_tensors="pt")
+        out = model.generate(
+            **enc,
+            num_beams=max(1, beams),
+            do_sample=False,
+            max_new_tokens=decode_budget(enc["input_ids"].shape[1]),
+            use_cache=True,
+        )
+        for i, decoded in zip(group, tokenizer.batch_decode(out, skip_special_tokens=True)):
+            results[i] = decoded
+    return results
+
+
+def translation_profile() -> str:
+    """Translation model, decoding mode and weight dtype; cached translations are bound to it."""
+    return f"{models.version('translator')}:beams={max(1, settings.TRANSLATION_NUM_BEAMS)}:{settings.NLP_TORCH_DTYPE}"
+
+
+def _translate_one(tokenizer, model, text: str) -> str | None:
     try:
-        out = pipe(text, max_length=512)
-        return out[0]["translation_text"]
+        return generate_translations(tokenizer, model, [text], 1)[0]
     except Exception:
-        return text
+        return None
+
+
+def translate_tr_en(text: str) -> str:
+    return translate_tr_en_batch([text])[0]
+
+
+def translate_tr_en_batch(texts: List[str]) -> List[str]:
+    mt = get_mt_model()
+    if mt is None:
+        return list(texts)
+    tokenizer, mt_model = mt
+    model = translation_profile()
+    keys = [_normalize_tr_text(t) for t in texts]
+    results: List[str | None] = [translation_cache.get(model, k) for k in keys]
+
+    # decode each distinct cache miss once
+    pending: Dict[str, List[int]] = {}
+    for i, cached in enumerate(results):
+        if cached is None:
+            pending.setdefault(keys[i], []).append(i)
+    if pending:
+        sources = [texts[idxs[0]] for idxs in pending.values()]
+        try:
+            translated: List[str | None] = list(
+                generate_translations(tokenizer, mt_model, sources, settings.NLP_INFERENCE_BATCH_SIZE)
+            )
+        except Exception:
+            # fall back to per-item translation so one bad input does not fail the batch
+            translated = [_translate_one(tokenizer, mt_model, src) for src in sources]
+        for (key, idxs), value in zip(pending.items(), translated):
+            if value is None:
+                continue
+            translation_cache.set(model, key, value)
+            for i in idxs:
+                results[i] = value
+    # untranslatable inputs go to the classifier as-is
+    return [r if r is not None else t for r, t in zip(results, texts)]
+
+
+_DOTLESS_I = str.maketrans({"ı": "i"})
+_REPEATED_CHARS = re.compile(r"(\w)\1{2,}")
+# common slang/variants, applied to folded text, so the values are folded too
+_REPLACEMENTS = {
+    'cokuzgunum': 'cok uzgunum', 'iyiyim': 'iyi yim',
+}
 
 
 def _strip_diacritics(s: str) -> str:
-    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+    # dotless ı has no combining mark in NFD, fold it explicitly
+    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn').translate(_DOTLESS_I)
 
 def _normalize_tr_text(text: str) -> str:
     t = text.strip().lower()
     # fold diacritics: ö->o, ü->u, ğ->g etc. for robust keyword match
     t = _strip_diacritics(t)
     # collapse repeated characters (cooook -> cook -> cok)
-    t = re.sub(r"(\w)\1{2,}", r"\1\1", t)
-    # common slang/variants
-    replacements = {
-        'cok': 'çok', 'cokuzgunum': 'çok üzgünüm', 'iyiyim': 'iyi yim',
-    }
-    for k, v in replacements.items():
+    t = _REPEATED_CHARS.sub(r"\1\1", t)
+    return _replace_variants(t)
+
+
+def _replace_variants(t: str) -> str:
+    for k, v in _REPLACEMENTS.items():
         t = t.replace(k, v)
     return t
 
 
+def _fold_lexicon(s: str) -> str:
+    # keywords and crisis patterns get the same folding and variant rewrites as the scanned text
+    return _replace_variants(_strip_diacritics(s))
+
+
+def _build_matcher(keywords: Dict[str, List[str]], crisis: List[Tuple[re.Pattern, str]]) -> LexiconMatcher:
+    return LexiconMatcher(keywords, crisis, normalize=_normalize_tr_text, fold=_fold_lexicon)
+
+
+_matcher = _build_matcher(EMOTION_KEYWORDS, [(p, CRISIS_REASON) for p in CRISIS_PATTERNS])
+# part of the analysis cache key: keyword hits bias scores and labels
+lexicon_version = "builtin"
+
+
+def scan_lexicons(text: str) -> List[LexiconHit]:
+    """Every keyword and crisis hit in one pass (offsets refer to the normalized text)."""
+    return _matcher.scan(text)
+
+
 def detect_crisis(text: str) -> Tuple[bool, str | None]:
-    t = text.lower()
-    for pat in CRISIS_PATTERNS:
-        if pat.search(t):
-            return True, "Kriz ifadesi tespit edildi"
-    return False, None
+    return _matcher.crisis(_matcher.scan(text))
+
+
+async def reload_lexicons() -> int:
+    """Rebuild the matcher from the builtin lexicons plus the `lexicons` collection.
+
+    Documents are either {kind: "emotion", label, words: [...]} or {kind: "crisis",
+    pattern, reason?}; they extend the builtin lists, never replace them, so a bad
+    reload cannot drop crisis coverage. Returns the number of documents applied.
+    """
+    global _matcher, lexicon_version
+    keywords: Dict[str, List[str]] = {label: list(words) for label, words in EMOTION_KEYWORDS.items()}
+    crisis: List[Tuple[re.Pattern, str]] = [(p, CRISIS_REASON) for p in CRISIS_PATTERNS]
+    applied = 0
+    fingerprint: List[str] = []
+    async for doc in lexicons_collection().find({}).sort("_id", 1):
+        kind = doc.get("kind")
+        if kind == "emotion" and doc.get("label") and isinstance(doc.get("words"), list):
+            keywords.setdefault(doc["label"], []).extend(str(w) for w in doc["words"] if w)
+        elif kind == "crisis" and doc.get("pattern"):
+            # checked as part of the combined scan regex, so one bad document cannot block the reload
+            error = crisis_pattern_error(str(doc["pattern"]), _fold_lexicon, _normalize_tr_text, doc.get("example"))
+            if error:
+                logger.warning("Skipping crisis lexicon %s (%r): %s", doc.get("_id"), doc["pattern"], error)
+                continue
+            crisis.append((re.compile(str(doc["pattern"]), re.I), doc.get("reason") or CRISIS_REASON))
+        else:
+            continue
+        applied += 1
+        fingerprint.append(repr((kind, doc.get("label"), doc.get("words"), doc.get("pattern"), doc.get("reason"))))
+    version = text_key(*fingerprint) if fingerprint else "builtin"
+    if version != lexicon_version:
+        # compile once per change, then swap atomically; requests keep using the old matcher meanwhile
+        _matcher = _build_matcher(keywords, crisis)
+        lexicon_version = version
+    return applied
+
+
+async def lexicon_reload_loop(interval_seconds: float):
+    while True:
+        try:
+            await reload_lexicons()
+        except Exception:
+            # keep serving with the last good matcher
+            logger.exception("Lexicon reload failed")
+        await asyncio.sleep(interval_seconds)
 
 
 def analyze_text(text: str) -> Dict[str, float]:
+    return analyze_texts([text])[0]
+
+
+def analyze_texts(texts: List[str], pipe=None, keyword_bias: bool = True) -> List[Dict[str, float]]:
+    """Score a batch of texts with one translation and one classifier pass over all chunks.
+
+    Long texts are split into sentence chunks so nothing past the model limit is dropped;
+    chunk scores are combined per text with a length-weighted average. `pipe` overrides
+    the active classifier (shadow evaluation); `keyword_bias=False` leaves out the lexicon
+    bias so the caller can apply it with its own matcher.
+    """
+    if not texts:
+        return []
+    owners: List[int] = []
+    chunks: List[str] = []
+    for i, text in enumerate(texts):
+        for chunk in split_chunks(text, settings.NLP_CHUNK_MAX_CHARS):
+            owners.append(i)
+            chunks.append(chunk)
+
     # Primary path: translate Turkish to English if enabled, then analyze with English emotion model
-    t = text
+    batch = list(chunks)
     if settings.USE_TR_EN_TRANSLATION:
-        t = translate_tr_en(text)
+        # English input goes straight to the classifier; only Turkish/mixed text is decoded
+        if settings.LANGID_SKIP_ENGLISH:
+            idxs = [i for i, c in enumerate(chunks) if langid.needs_translation(c)]
+        else:
+            idxs = list(range(len(chunks)))
+        if idxs:
+            for i, translated in zip(idxs, translate_tr_en_batch([chunks[i] for i in idxs])):
+                batch[i] = translated
+
+    pipe = pipe or get_pipeline()
+    outputs: List[List[LabelScore]] = run_bucketed(pipe, batch, settings.NLP_INFERENCE_BATCH_SIZE, truncation=True)
+
+    sums: List[Dict[str, float]] = [{} for _ in texts]
+    weights: List[float] = [0.0] * len(texts)
+    for owner, chunk, items in zip(owners, chunks, outputs):
+        w = float(len(chunk))
+        weights[owner] += w
+        for item in items:
+            label = item["label"].lower()
+            sums[owner][label] = sums[owner].get(label, 0.0) + w * float(item["score"])
+
+    results = [{label: value / weight for label, value in total.items()} if weight else total for total, weight in zip(sums, weights)]
+    return apply_keyword_bias(texts, results) if keyword_bias else results
+
+
+def apply_keyword_bias(texts: List[str], results: List[Dict[str, float]]) -> List[Dict[str, float]]:
+    for text, scores in zip(texts, results):
+        # Secondary hint: if explicit emotion keywords present in original text, bias towards that label
+        key = keyword_emotion(text)
+        if key and key in scores:
+            # Light bias to ensure chosen label becomes top if close
+            scores[key] = max(scores[key], 0.95)
+    return results
+
+
+def analyze_model_only(texts: List[str]) -> List[Dict[str, float]]:
+    return analyze_texts(texts, keyword_bias=False)
+
 
-    pipe = get_pipeline()
-    outputs: List[List[LabelScore]] = pipe(t)  # type: ignore[assignment]
-    items: List[LabelScore] = outputs[0]
-    scores: Dict[str, float] = {item["label"].lower(): float(item["score"]) for item in items}
+async def analyze_on_executor(texts: List[str]) -> List[Dict[str, float]]:
+    """`analyze_texts` on the inference executor, biased with this process's lexicons."""
+    if not PROCESS_POOL:
+        return await inference_executor.run(analyze_texts, texts)
+    return apply_keyword_bias(texts, await inference_executor.run(analyze_model_only, texts))
 
-    # Secondary hint: if explicit emotion keywords present in original text, bias towards that label
+
+class MicroBatcher:
+    """Gathers concurrent requests for a short window and scores them as one batch.
+
+    Callers await `submit(text)`; a single worker task drains the queue for up to
+    `max_wait_ms` (or until `max_batch_size` items are queued) and runs `fn` once on the
+    whole batch on the inference executor, off the event loop. The queue is ordered by
+    priority, so crisis-flagged texts are taken into the next batch ahead of everyone else
+    and are accepted even when the normal lane is full.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[str]], List[Dict[str, float]]],
+        executor: InferenceExecutor,
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_queue: int,
+    ):
+        self._fn = fn
+        self._executor = executor
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._max_queue = max(1, max_queue)
+        self._queue: asyncio.PriorityQueue | None = None
+        self._worker: asyncio.Task | None = None
+        self._seq = itertools.count()
+
+    def _ensure_worker(self) -> asyncio.PriorityQueue:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.PriorityQueue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        assert self._queue is not None
+        return self._queue
+
+    async def submit(self, text: str, priority: bool = False) -> Dict[str, float]:
+        queue = self._ensure_worker()
+        if not priority and queue.qsize() >= self._max_queue:
+            raise InferenceBusyError("Inference queue is full")
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        # (lane, seq) orders crisis first, FIFO within a lane, and never compares futures
+        queue.put_nowait((PRIORITY_CRISIS if priority else PRIORITY_NORMAL, next(self._seq), text, fut))
+        return await fut
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self, queue: asyncio.PriorityQueue) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [(await queue.get())[2:]]
+        # wait for a free inference slot before closing the batch, so requests that
+        # arrive while every slot is busy join this batch instead of queueing behind it
+        await self._executor.acquire(bounded=False)
+        deadline = loop.time() + self._max_wait
+        while len(batch) < self._max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait()[2:])
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append((await asyncio.wait_for(queue.get(), remaining))[2:])
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            results = await self._executor.run_acquired(self._fn, [t for t, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), scores in zip(batch, results):
+            if not fut.done():
+                fut.set_result(scores)
+
+    async def _run(self):
+        queue = self._queue
+        assert queue is not None
+        while True:
+            batch = await self._collect(queue)
+            # drop callers that already gave up (client disconnect, timeout)
+            batch = [(t, f) for t, f in batch if not f.done()]
+            if not batch:
+                self._executor.release()
+                continue
+            asyncio.get_running_loop().create_task(self._dispatch(batch))
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+PRIORITY_CRISIS = 0
+PRIORITY_NORMAL = 1
+
+_batcher = MicroBatcher(
+    analyze_model_only if PROCESS_POOL else analyze_texts,
+    inference_executor,
+    max_batch_size=settings.NLP_BATCH_MAX_SIZE,
+    max_wait_ms=settings.NLP_BATCH_MAX_WAIT_MS,
+    max_queue=settings.NLP_MAX_QUEUE,
+)
+
+
+# Optional shared inference server; API workers then hold no model weights themselves
+inference_client: InferenceClient | None = (
+    InferenceClient(settings.NLP_SERVER_SOCKET, settings.NLP_SERVER_TIMEOUT_SECONDS) if settings.NLP_SERVER_SOCKET else None
+)
+
+
+def _server_failed(e: InferenceServerUnavailable):
+    assert inference_client is not None
+    if not settings.NLP_SERVER_FALLBACK:
+        raise InferenceBusyError(f"Inference server unavailable: {e}")
+    inference_client.fallbacks += 1
+
+
+async def analyze_text_local(text: str, priority: bool = False) -> Dict[str, float]:
+    """In-process path: batched, bounded and run off the event loop."""
+    scores = await _batcher.submit(text, priority=priority)
+    if PROCESS_POOL:
+        return apply_keyword_bias([text], [scores])[0]
+    if registry.sample_shadow():
+        task = asyncio.get_running_loop().create_task(_shadow_compare(text))
+        _shadow_tasks.add(task)
+        task.add_done_callback(_shadow_tasks.discard)
+    return scores
+
+
+_shadow_tasks: set = set()
+
+
+def shadow_compare(text: str):
+    """Score one text with the active and the shadow classifier and record the deltas."""
+    if not models.version("shadow_classifier"):
+        return
+    shadow_pipe = models.get("shadow_classifier")[2]
+    # the translation is cached by the live request, so both timings are classifier-only
+    started = time.perf_counter()
+    primary = analyze_texts([text])[0]
+    middle = time.perf_counter()
+    candidate = analyze_texts([text], pipe=shadow_pipe)[0]
+    finished = time.perf_counter()
+    delta = max((abs(primary.get(k, 0.0) - candidate.get(k, 0.0)) for k in primary.keys() | candidate.keys()), default=0.0)
+    registry.shadow.record(middle - started, finished - middle, pick_label(text, primary), pick_label(text, candidate), delta)
+
+
+async def _shadow_compare(text: str):
+    # shadow work never queues behind or ahead of live traffic
+    if inference_executor.waiting:
+        registry.shadow.skipped += 1
+        return
+    try:
+        await inference_executor.run(shadow_compare, text)
+    except InferenceBusyError:
+        registry.shadow.skipped += 1
+    except Exception:
+        registry.shadow.errors += 1
+
+
+async def analyze_text_async(text: str, priority: bool = False) -> Tuple[Dict[str, float], str]:
+    """Async entry point for routers: the inference server if configured, else in-process.
+
+    Returns the scores and the model version that produced them.
+    """
+    if inference_client is not None:
+        try:
+            scores, version = await inference_client.analyze([text], priority=priority)
+            return scores[0], version
+        except InferenceServerUnavailable as e:
+            _server_failed(e)
+    version = model_version()
+    return await analyze_text_local(text, priority=priority), version
+
+
+async def _score_texts(texts: List[str]) -> Tuple[List[Dict[str, float]], str]:
+    if inference_client is not None:
+        try:
+            return await inference_client.analyze(texts)
+        except InferenceServerUnavailable as e:
+            _server_failed(e)
+    version = model_version()
+    return await analyze_on_executor(texts), version
+
+
+def scoring_version() -> str:
+    """Model version new scores are expected to carry: the server's when one is used."""
+    if inference_client is not None and inference_client.model_version:
+        return inference_client.model_version
+    return model_version()
+
+
+def pick_label(text: str, scores: Dict[str, float]) -> str:
+    # pick label with uncertainty handling
+    label = keyword_emotion(text) or top_label(scores)
+    if is_uncertain(scores):
+        label = "uncertain"
+    return label
+
+
+def tier1_scores(text: str) -> Dict[str, float] | None:
+    """Cheap first-tier scores: the offline TF-IDF model if trained, else keywords alone."""
     key = keyword_emotion(text)
+    model = get_tier1_model(settings.CASCADE_MODEL_PATH)
+    if model is None:
+        return {key: 0.95} if key else None
+    scores = model.predict(_normalize_tr_text(text))
     if key and key in scores:
-        # Light bias to ensure chosen label becomes top if close
         scores[key] = max(scores[key], 0.95)
     return scores
 
 
+def _tier1_accept(text: str) -> Tuple[Dict[str, float] | None, bool]:
+    """(tier-1 scores, whether they are confident enough to skip the transformer)."""
+    if not settings.CASCADE_ENABLED:
+        return None, False
+    scores = tier1_scores(text)
+    confident = scores is not None and not is_uncertain(scores, threshold=settings.CASCADE_THRESHOLD)
+    # a sample of confident answers is still escalated to measure tier agreement
+    if confident and random.random() < settings.CASCADE_AUDIT_RATE:
+        confident = False
+    return scores, confident
+
+
+def _tier1_model_version() -> str:
+    return f"tier1:{get_tier1_version()}"
+
+
+def _record_tiers(t1: Dict[str, float] | None, accepted: bool, t2: Dict[str, float] | None = None):
+    if not settings.CASCADE_ENABLED:
+        return
+    cascade_stats.record(1 if accepted else 2)
+    if t1 and t2:
+        cascade_stats.compare(top_label(t1), top_label(t2))
+
+
+def _analysis_key(text: str) -> str:
+    mt_model = translation_profile() if settings.USE_TR_EN_TRANSLATION else ""
+    cascade = f"cascade:{settings.CASCADE_THRESHOLD}:{get_tier1_version()}" if settings.CASCADE_ENABLED else ""
+    return text_key(scoring_version(), settings.NLP_TORCH_DTYPE, mt_model, lexicon_version, cascade, _normalize_tr_text(text))
+
+
+admission = AdmissionController(
+    depth_fn=lambda: _batcher.queue_depth() + inference_executor.waiting,
+    max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    max_latency_ms=settings.ADMISSION_MAX_LATENCY_MS,
+    recover_ratio=settings.ADMISSION_RECOVER_RATIO,
+)
+
+
+def degraded_analysis(text: str) -> Tuple[Dict[str, float], str]:
+    """Keyword-only result used when the models are shed under overload."""
+    key = keyword_emotion(text)
+    if key:
+        return {key: 0.95}, key
+    return {}, "uncertain"
+
+
+async def analyze_message(text: str, priority: bool = False) -> Tuple[Dict[str, float], str, bool, str]:
+    """Scores, final label, a degraded flag and the model version for a message.
+
+    Repeated texts skip both models.
+    Under overload (admission control tripped or the inference queue full) the models are
+    skipped and a keyword-only result is returned with degraded=True; it is not cached.
+    Crisis detection is deliberately not part of this: it is cheap, never shed and runs
+    on the raw text. `priority` (crisis-flagged messages) jumps the inference queue and
+    bypasses load shedding.
+    """
+    key = _analysis_key(text)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1], False, cached[2]
+    started = time.perf_counter()
+    t1, accepted = _tier1_accept(text)
+    if accepted:
+        assert t1 is not None
+        scores = t1
+        version = _tier1_model_version()
+    else:
+        if settings.ADMISSION_ENABLED and not priority and not admission.admit():
+            return (*degraded_analysis(text), True, KEYWORD_VERSION)
+        try:
+            scores, version = await analyze_text_async(text, priority=priority)
+        except InferenceBusyError:
+            return (*degraded_analysis(text), True, KEYWORD_VERSION)
+        admission.observe(time.perf_counter() - started)
+    _record_tiers(t1, accepted, None if accepted else scores)
+    label = pick_label(text, scores)
+    analysis_cache.set(key, scores, label, time.perf_counter() - started, version)
+    return scores, label, False, version
+
+
+async def analyze_messages(texts: List[str], chunk_size: int) -> List[Tuple[Dict[str, float], str, str]]:
+    """Bulk variant of `analyze_message` for imports: cache first, then batched forward passes.
+
+    Misses are scored in chunks of `chunk_size`, each one executor call, so a large import
+    interleaves with live traffic instead of holding the model for the whole request.
+    Raises InferenceBusyError while admission control is shedding load.
+    """
+    if settings.ADMISSION_ENABLED and not admission.admit():
+        raise InferenceBusyError("Inference is overloaded, retry the import later")
+    results: List[Tuple[Dict[str, float], str, str] | None] = []
+    pending: Dict[str, List[int]] = {}
+    tier1: Dict[str, Dict[str, float] | None] = {}
+    for i, text in enumerate(texts):
+        key = _analysis_key(text)
+        cached = analysis_cache.get(key)
+        if cached is None and key not in pending:
+            t1, accepted = _tier1_accept(text)
+            if accepted:
+                assert t1 is not None
+                _record_tiers(t1, True)
+                cached = (t1, pick_label(text, t1), _tier1_model_version())
+                analysis_cache.set(key, cached[0], cached[1], 0.0, cached[2])
+            else:
+                tier1[key] = t1
+        results.append(cached)
+        if cached is None:
+            pending.setdefault(key, []).append(i)
+
+    keys = list(pending)
+    step = max(1, chunk_size)
+    for start in range(0, len(keys), step):
+        chunk = keys[start:start + step]
+        chunk_texts = [texts[pending[k][0]] for k in chunk]
+        started = time.perf_counter()
+        chunk_scores, version = await _score_texts(chunk_texts)
+        cost = (time.perf_counter() - started) / len(chunk)
+        for key, text, scores in zip(chunk, chunk_texts, chunk_scores):
+            _record_tiers(tier1.get(key), False, scores)
+            label = pick_label(text, scores)
+            analysis_cache.set(key, scores, label, cost, version)
+            for i in pending[key]:
+                results[i] = (dict(scores), label, version)
+    return results  # type: ignore[return-value]  # every slot is filled above
+
+
+WARMUP_TEXTS: List[str] = [
+    "Bugün kendimi çok iyi hissediyorum.",
+    "Moralim bozuk ve biraz endişeliyim.",
+    "I feel a bit anxious but hopeful today.",
+]
+
+# Readiness of the preloaded models; "idle" means preload is disabled (lazy loading)
+warmup_state: Dict[str, object] = {"status": "idle", "seconds": None, "error": None}
+
+
+def warm_up():
+    """Load both pipelines and run a few inferences so the first request pays nothing extra."""
+    started = time.perf_counter()
+    clf = get_pipeline()
+    mt = get_mt_model()
+    for n in (1, len(WARMUP_TEXTS)):
+        batch = WARMUP_TEXTS[:n]
+        if mt is not None:
+            batch = generate_translations(mt[0], mt[1], batch, n)
+        clf(batch, batch_size=n)
+    return time.perf_counter() - started
+
+
+# a failed warm-up (e.g. a transient hub or network error) is retried with this backoff
+WARMUP_RETRY_SECONDS = (5.0, 300.0)
+_warmup_retry: asyncio.Task | None = None
+
+
+async def _warm_up_local_once():
+    warmup_state.update(status="warming", error=None)
+    seconds = await inference_executor.run(warm_up)
+    warmup_state.update(status="ready", seconds=round(seconds, 3), error=None)
+
+
+async def _warm_up_server_once():
+    assert inference_client is not None
+    # the server owns the models; this worker is warm once the server answers
+    warmup_state.update(status="warming", error=None)
+    started = time.perf_counter()
+    await inference_client.analyze(WARMUP_TEXTS)
+    warmup_state.update(status="ready", seconds=round(time.perf_counter() - started, 3), error=None)
+
+
+async def _retry_warm_up(attempt: Callable[[], Awaitable[None]]):
+    delay, max_delay = WARMUP_RETRY_SECONDS
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            await attempt()
+            return
+        except Exception as e:
+            warmup_state.update(status="failed", error=str(e))
+            delay = min(delay * 2, max_delay)
+            logger.warning("Model warm-up failed again, next attempt in %.0fs: %s", delay, e)
+
+
+def _warm_up_failed(attempt: Callable[[], Awaitable[None]], e: Exception):
+    global _warmup_retry
+    warmup_state.update(status="failed", error=str(e))
+    logger.warning("Model warm-up failed, retrying in the background: %s", e)
+    if _warmup_retry is None or _warmup_retry.done():
+        _warmup_retry = asyncio.get_running_loop().create_task(_retry_warm_up(attempt))
+
+
+async def warm_up_local():
+    try:
+        await _warm_up_local_once()
+    except Exception as e:
+        _warm_up_failed(_warm_up_local_once, e)
+
+
+async def warm_up_async():
+    if inference_client is not None:
+        try:
+            await _warm_up_server_once()
+            return
+        except (InferenceServerUnavailable, InferenceBusyError) as e:
+            if not settings.NLP_SERVER_FALLBACK:
+                _warm_up_failed(_warm_up_server_once, e)
+                return
+    await warm_up_local()
+
+
+def is_ready() -> bool:
+    return warmup_state["status"] in ("idle", "ready")
+
+
+def nlp_stats() -> Dict[str, object]:
+    return {
+        "executor": inference_executor.stats(),
+        "batch_queue_depth": _batcher.queue_depth(),
+        "translation_cache": translation_cache.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "language_routes": langid.stats(),
+        "cascade": cascade_stats.stats() if settings.CASCADE_ENABLED else None,
+        "admission": admission.stats() if settings.ADMISSION_ENABLED else None,
+        "warmup": warmup_state,
+        "models": models.stats(),
+        "registry": registry.state(),
+        "inference_server": inference_client.stats() if inference_client is not None else None,
+    }
+
+
+async def close_inference():
+    if _warmup_retry is not None:
+        _warmup_retry.cancel()
+    if inference_client is not None:
+        await inference_client.close()
+    await _batcher.close()
+    inference_executor.shutdown()
+
+
 def top_label(scores: Dict[str, float]) -> str:
     return max(scores.items(), key=lambda kv: kv[1])[0]
 
 
 def keyword_emotion(text: str) -> str | None:
-    t = _normalize_tr_text(text)
-    for label, words in EMOTION_KEYWORDS.items():
-        for w in words:
-            if _strip_diacritics(w) in t:
-                return label
-    return None
+    return _matcher.keyword_emotion(_matcher.scan(text))
 
 
 def is_uncertain(scores: Dict[str, float], threshold: float = 0.6, margin: float = 0.1) -> bool:
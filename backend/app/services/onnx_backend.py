@@ -0,0 +1,85 @@
+# ONNX Runtime backend for the emotion classifier and the TR->EN translator.
+# Models are exported once with `optimum` into ONNX_EXPORT_DIR/<model>/<fp32|int8> and
+# loaded from there on later starts. Requires the optional `optimum[onnxruntime]` extra.
+from typing import List, Tuple
+import os
+import platform
+from ..core.config import settings
+
+
+class OnnxBackendUnavailable(Exception):
+    pass
+
+
+def _require_optimum():
+    try:
+        import optimum.onnxruntime as ort  # noqa: F401
+    except ImportError as e:
+        raise OnnxBackendUnavailable("NLP_BACKEND=onnx requires `pip install optimum[onnxruntime]`") from e
+    return ort
+
+
+def export_dir(model_name: str, quantize: bool) -> str:
+    return os.path.join(
+        os.path.abspath(settings.ONNX_EXPORT_DIR),
+        model_name.replace("/", "__"),
+        "int8" if quantize else "fp32",
+    )
+
+
+def _quantization_config(ort):
+    # dynamic (weight-only calibration free) int8; operators run on any CPU of the family
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return ort.configuration.AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    return ort.configuration.AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+
+
+def _quantize_dir(ort, src: str, dst: str, onnx_files: List[str]):
+    qconfig = _quantization_config(ort)
+    for file_name in onnx_files:
+        quantizer = ort.ORTQuantizer.from_pretrained(src, file_name=file_name)
+        quantizer.quantize(save_dir=dst, quantization_config=qconfig)
+    # quantizer writes `<name>_quantized.onnx`; rename so the ORT model classes find them
+    for file_name in onnx_files:
+        quantized = os.path.join(dst, file_name.replace(".onnx", "_quantized.onnx"))
+        if os.path.exists(quantized):
+            os.replace(quantized, os.path.join(dst, file_name))
+
+
+def _export(model_cls, model_name: str, quantize: bool, source: str | None = None) -> str:
+    """Export (and optionally quantize) once; returns the directory holding the ONNX files.
+
+    `source` is where the torch weights are read from (a local snapshot), defaulting to the hub id.
+    """
+    ort = _require_optimum()
+    fp32_dir = export_dir(model_name, quantize=False)
+    if not os.path.exists(os.path.join(fp32_dir, "config.json")):
+        model = model_cls.from_pretrained(source or model_name, export=True)
+        model.save_pretrained(fp32_dir)
+    if not quantize:
+        return fp32_dir
+    int8_dir = export_dir(model_name, quantize=True)
+    if not os.path.exists(os.path.join(int8_dir, "config.json")):
+        os.makedirs(int8_dir, exist_ok=True)
+        onnx_files = sorted(f for f in os.listdir(fp32_dir) if f.endswith(".onnx"))
+        _quantize_dir(ort, fp32_dir, int8_dir, onnx_files)
+        # tokenizer/config files are needed next to the quantized graphs
+        for f in os.listdir(fp32_dir):
+            if not f.endswith(".onnx") and not os.path.exists(os.path.join(int8_dir, f)):
+                with open(os.path.join(fp32_dir, f), "rb") as src, open(os.path.join(int8_dir, f), "wb") as dst:
+                    dst.write(src.read())
+    return int8_dir
+
+
+def load_classifier(model_name: str, quantize: bool, source: str | None = None) -> Tuple[object, str]:
+    """Returns (ORT sequence-classification model, directory it was loaded from)."""
+    ort = _require_optimum()
+    path = _export(ort.ORTModelForSequenceClassification, model_name, quantize, source)
+    return ort.ORTModelForSequenceClassification.from_pretrained(path), path
+
+
+def load_translator(model_name: str, quantize: bool, source: str | None = None) -> Tuple[object, str]:
+    """Returns (ORT seq2seq model, directory it was loaded from)."""
+    ort = _require_optimum()
+    path = _export(ort.ORTModelForSeq2SeqLM, model_name, quantize, source)
+    return ort.ORTModelForSeq2SeqLM.from_pretrained(path, use_cache=True), path
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from typing import NamedTuple
+import time
+from pymongo import ReturnDocument
+from ..db.mongodb import quotas_collection
+
+
+class QuotaExceededError(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QuotaCharge(NamedTuple):
+    remaining: int
+    window_start: datetime  # window the units were charged to, for `refund_quota`
+
+
+async def consume_quota(user_id: str, scope: str, amount: int, limit: int, window_seconds: int) -> QuotaCharge:
+    """Atomically charge `amount` units against a fixed-window per-user quota.
+
+    Counters live in MongoDB so every API worker shares them. Returns the units left in
+    the current window and the window charged; raises QuotaExceededError (and refunds) if the
+    charge does not fit.
+    """
+    # epoch seconds, not datetime.utcnow().timestamp(): a naive datetime is read as local time
+    now = time.time()
+    epoch = int(now)
+    window_start = datetime.utcfromtimestamp(epoch - epoch % window_seconds)  # naive UTC, like every stored timestamp
+    window_end = window_start + timedelta(seconds=window_seconds)
+    col = quotas_collection()
+    key = {"user_id": user_id, "scope": scope, "window_start": window_start}
+    doc = await col.find_one_and_update(
+        key,
+        {"$inc": {"used": amount}, "$setOnInsert": {"expires_at": window_end}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    used = int(doc.get("used", 0))
+    if used > limit:
+        await col.update_one(key, {"$inc": {"used": -amount}})
+        retry_after = max(1, int(epoch - epoch % window_seconds + window_seconds - now))
+        raise QuotaExceededError(f"Quota exceeded: {limit} items per {window_seconds}s", retry_after)
+    return QuotaCharge(limit - used, window_start)
+
+
+async def refund_quota(user_id: str, scope: str, amount: int, charge: QuotaCharge):
+    """Give back units of a charge whose work did not happen, in the window they were charged to."""
+    await quotas_collection().update_one(
+        {"user_id": user_id, "scope": scope, "window_start": charge.window_start}, {"$inc": {"used": -amount}}
+    )
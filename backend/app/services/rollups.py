@@ -0,0 +1,77 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+from pymongo import UpdateOne
+from ..db.mongodb import mood_rollups_collection
+
+# One document per (user_id, UTC day):
+#   {user_id, day, messages, emotions: {label: n}, score_sums: {label: sum}, checkins, checkin_score_sum}
+# Means are derived on read (score_sums / messages, checkin_score_sum / checkins), so every
+# write is a single commutative $inc upsert.
+
+
+def day_start(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _field(label: str) -> str:
+    # labels become field names; keep them valid
+    return label.replace(".", "_").replace("$", "_") or "unknown"
+
+
+def message_inc(label: str, scores: Dict[str, float]) -> Dict[str, float]:
+    inc: Dict[str, float] = {"messages": 1, f"emotions.{_field(label)}": 1}
+    for key, value in scores.items():
+        inc[f"score_sums.{_field(key)}"] = float(value)
+    return inc
+
+
+def _upsert(user_id: str, day: datetime, inc: Dict[str, float]) -> UpdateOne:
+    return UpdateOne({"user_id": user_id, "day": day}, {"$inc": inc}, upsert=True)
+
+
+async def record_message(user_id: str, timestamp: datetime, label: str, scores: Dict[str, float]):
+    await mood_rollups_collection().update_one(
+        {"user_id": user_id, "day": day_start(timestamp)}, {"$inc": message_inc(label, scores)}, upsert=True
+    )
+
+
+async def record_messages(docs: Iterable[Dict[str, Any]]):
+    """Roll up many stored messages with one upsert per (user, day)."""
+    merged: Dict[Tuple[str, datetime], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for doc in docs:
+        inc = merged[(doc["user_id"], day_start(doc["timestamp"]))]
+        for key, value in message_inc(doc["emotion"], doc.get("scores") or {}).items():
+            inc[key] += value
+    if merged:
+        ops = [_upsert(user_id, day, dict(inc)) for (user_id, day), inc in merged.items()]
+        await mood_rollups_collection().bulk_write(ops, ordered=False)
+
+
+async def record_checkin(user_id: str, timestamp: datetime, score: int):
+    await mood_rollups_collection().update_one(
+        {"user_id": user_id, "day": day_start(timestamp)},
+        {"$inc": {"checkins": 1, "checkin_score_sum": score}},
+        upsert=True,
+    )
+
+
+async def daily_rollups(user_id: str, since: datetime) -> List[Dict[str, Any]]:
+    cursor = mood_rollups_collection(analytics=True).find(
+        {"user_id": user_id, "day": {"$gte": day_start(since)}}, {"_id": 0, "user_id": 0}
+    ).sort("day", 1)
+    return await cursor.to_list(length=None)
+
+
+def summarize(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Counts plus derived means for one rollup document."""
+    messages = doc.get("messages", 0)
+    checkins = doc.get("checkins", 0)
+    return {
+        "day": doc["day"],
+        "messages": messages,
+        "emotions": doc.get("emotions", {}),
+        "mean_scores": {k: v / messages for k, v in doc.get("score_sums", {}).items()} if messages else {},
+        "checkins": checkins,
+        "checkin_avg": doc.get("checkin_score_sum", 0) / checkins if checkins else None,
+    }
@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, messages_collection, model_registry_collection
+from app.services.inference import inference_executor
+from app.services.nlp import PROCESS_POOL, analyze_on_executor, model_version, pick_label, registry, reload_lexicons
+
+
+class Checkpoint:
+    """Progress of one backfill run in a small JSON file, rewritten atomically after every batch."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state: Dict[str, Any] = {}
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({**self.state, "updated_at": datetime.utcnow().isoformat()}, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class Throttle:
+    """Keeps the average rate at or below `per_second` items since start."""
+
+    def __init__(self, per_second: float):
+        self.per_second = per_second
+        self.started = time.monotonic()
+        self.done = 0
+
+    async def wait(self, items: int):
+        self.done += items
+        if self.per_second <= 0:
+            return
+        ahead = self.done / self.per_second - (time.monotonic() - self.started)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+
+def build_query(last_id: ObjectId | None, end_id: ObjectId | None, version: str, only_stale: bool) -> Dict[str, Any]:
+    id_range: Dict[str, Any] = {}
+    if last_id is not None:
+        id_range["$gt"] = last_id
+    if end_id is not None:
+        id_range["$lte"] = end_id
+    query: Dict[str, Any] = {"_id": id_range} if id_range else {}
+    if only_stale:
+        query["model_version"] = {"$ne": version}
+    return query
+
+
+async def rescore(docs: List[Dict[str, Any]], chunk_size: int, version: str) -> Tuple[List[UpdateOne], int]:
+    """Update operations for `docs` plus how many of them change label."""
+    texts = [d.get("text") or "" for d in docs]
+    scores: List[Dict[str, float]] = []
+    for start in range(0, len(texts), chunk_size):
+        # one large batched forward pass per chunk, run on the inference executor
+        scores.extend(await analyze_on_executor(texts[start:start + chunk_size]))
+    ops = []
+    relabelled = 0
+    for doc, text, s in zip(docs, texts, scores):
+        label = pick_label(text, s)
+        relabelled += label != doc.get("emotion")
+        ops.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {
+                "$set": {"emotion": label, "scores": s, "model_version": version},
+                "$unset": {"degraded": "", "scores_pending": ""},
+            },
+        ))
+    return ops, relabelled
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Re-score stored messages with the current models and lexicons")
+    parser.add_argument("--checkpoint", default="cache/backfill_checkpoint.json", help="Progress file used to resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over")
+    parser.add_argument("--start-id", default=None, help="Only messages with _id greater than this")
+    parser.add_argument("--end-id", default=None, help="Only messages with _id up to and including this")
+    parser.add_argument("--all", action="store_true", help="Re-score every message, not only those with another model_version")
+    parser.add_argument("--batch-size", type=int, default=512, help="Messages read and written per round trip")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Texts per forward pass")
+    parser.add_argument("--max-rate", type=float, default=20.0, help="Messages per second (0 = unthrottled)")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many messages (0 = no limit)")
+    parser.add_argument("--dry-run", action="store_true", help="Score but do not write")
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        try:
+            await reload_lexicons()
+        except Exception:
+            print("Could not load lexicons from the database; using the builtin lists")
+        # score with the versions the registry currently serves, not just the configured defaults
+        # (a process pool always runs the configured models)
+        if not PROCESS_POOL:
+            await registry.apply(await model_registry_collection().find_one({"_id": "active"}), load_shadow=False)
+        version = model_version()
+        checkpoint = Checkpoint(args.checkpoint)
+        if not args.restart and checkpoint.load():
+            if checkpoint.state.get("model_version") != version:
+                print(f"Checkpoint was written for {checkpoint.state.get('model_version')!r}; use --restart to re-score for {version!r}")
+                return
+            print(f"Resuming after _id {checkpoint.state.get('last_id')} ({checkpoint.state.get('processed', 0)} done)")
+        else:
+            checkpoint.state = {"model_version": version, "last_id": args.start_id, "processed": 0, "relabelled": 0}
+        end_id = args.end_id or checkpoint.state.get("end_id")
+        end_id = ObjectId(end_id) if end_id else None
+        if end_id is None:
+            # pin the upper bound so messages written during the run (already current) are not revisited
+            newest = await messages_collection().find_one({}, {"_id": 1}, sort=[("_id", -1)])
+            end_id = newest["_id"] if newest else None
+        checkpoint.state["end_id"] = str(end_id) if end_id else None
+
+        col = messages_collection()
+        throttle = Throttle(args.max_rate)
+        processed_this_run = 0
+        while True:
+            last_id = ObjectId(checkpoint.state["last_id"]) if checkpoint.state.get("last_id") else None
+            query = build_query(last_id, end_id, version, only_stale=not args.all)
+            size = args.batch_size
+            if args.limit:
+                size = min(size, args.limit - processed_this_run)
+                if size <= 0:
+                    break
+            docs = await col.find(query, {"text": 1, "emotion": 1}).sort("_id", 1).limit(size).to_list(length=size)
+            if not docs:
+                break
+            started = time.perf_counter()
+            ops, relabelled = await rescore(docs, max(1, args.chunk_size), version)
+            if not args.dry_run:
+                await col.bulk_write(ops, ordered=False)
+            checkpoint.state["last_id"] = str(docs[-1]["_id"])
+            checkpoint.state["processed"] = checkpoint.state.get("processed", 0) + len(docs)
+            checkpoint.state["relabelled"] = checkpoint.state.get("relabelled", 0) + relabelled
+            if not args.dry_run:
+                checkpoint.save()
+            processed_this_run += len(docs)
+            print(
+                f"{checkpoint.state['processed']} processed, {checkpoint.state['relabelled']} relabelled, "
+                f"last _id {checkpoint.state['last_id']} ({len(docs) / (time.perf_counter() - started):.1f} msg/s)"
+            )
+            await throttle.wait(len(docs))
+        print(f"Done: {checkpoint.state.get('processed', 0)} messages at {version!r}")
+    finally:
+        inference_executor.shutdown()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
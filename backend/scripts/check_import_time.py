@@ -0,0 +1,67 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only model loading may import; finding one under `import app.main` is a regression
+HEAVY_MODULES = ("torch", "transformers", "optimum", "onnxruntime", "sentencepiece", "sacremoses", "numpy", "tokenizers")
+
+
+def import_profile(module: str) -> Tuple[List[Tuple[str, int, int]], float]:
+    """Rows of (module, self us, cumulative us) from `python -X importtime`, plus wall time."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BACKEND_DIR, os.environ.get("PYTHONPATH")])))
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if out.returncode != 0:
+        print(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"import {module} failed")
+        sys.exit(2)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name, int(self_us), int(cumulative_us)))
+    return rows, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when importing the app pulls in the NLP stack or gets slow")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Max total import time")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    rows, wall = import_profile(args.module)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    heavy = sorted({name for name, _, _ in rows if name.split(".")[0] in HEAVY_MODULES})
+
+    print(f"import {args.module}: {total_ms:.0f}ms in imports, {wall * 1000:.0f}ms process wall time")
+    top_level = [r for r in rows if "." not in r[0]]
+    for name, _, cumulative_us in sorted(top_level, key=lambda r: -r[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(heavy[:10])}{' ...' if len(heavy) > 10 else ''}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.0f}ms exceeds budget {args.budget_ms:.0f}ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
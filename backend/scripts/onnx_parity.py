@@ -0,0 +1,81 @@
+import argparse
+import sys
+import time
+from typing import Dict, List
+
+from app.core.config import settings
+from app.services.nlp import build_classifier_pipeline, build_translation_model, generate_translations, top_label
+
+# Fixed Turkish/English probe set covering every label family the keyword map knows about
+SAMPLES: List[str] = [
+    "Bugün çok mutluyum, her şey harika gidiyor.",
+    "Moralim bozuk, hiçbir şey yapmak istemiyorum.",
+    "Patronuma çok sinirliyim, beni dinlemiyor.",
+    "Yarınki sınav için çok endişeliyim.",
+    "Bunu hiç beklemedim, gerçekten şaşırdım.",
+    "Ailemi çok seviyorum.",
+    "Bu yemek iğrenç kokuyor.",
+    "Bugün normal bir gündü, fark etmiyor.",
+    "Yalnız hissediyorum ve kimse beni anlamıyor.",
+    "I feel a bit anxious but hopeful today.",
+    "This is the best day of my life!",
+    "I am so tired of everything.",
+]
+
+
+def _scores(pipe, texts: List[str]) -> List[Dict[str, float]]:
+    outputs = pipe(texts, batch_size=len(texts))
+    return [{item["label"].lower(): float(item["score"]) for item in items} for items in outputs]
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ONNX Runtime outputs against the torch models")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Max allowed absolute score difference")
+    parser.add_argument("--no-translation", action="store_true", help="Skip the MarianMT comparison")
+    args = parser.parse_args()
+
+    texts = list(SAMPLES)
+    if settings.USE_TR_EN_TRANSLATION and not args.no_translation:
+        tok_torch, mt_torch = build_translation_model("torch")
+        tok_onnx, mt_onnx = build_translation_model("onnx")
+        ref, t_torch = _timed(lambda xs: generate_translations(tok_torch, mt_torch, xs, len(xs)), texts)
+        got, t_onnx = _timed(lambda xs: generate_translations(tok_onnx, mt_onnx, xs, len(xs)), texts)
+        same = sum(1 for a, b in zip(ref, got) if a.strip() == b.strip())
+        print(f"translation: {same}/{len(texts)} identical  torch={t_torch:.3f}s onnx={t_onnx:.3f}s")
+        for src, a, b in zip(texts, ref, got):
+            if a.strip() != b.strip():
+                print(f"  ~ {src!r}\n    torch: {a!r}\n    onnx:  {b!r}")
+        # classify the torch translations on both backends so only the classifier is compared below
+        texts = ref
+
+    _, _, clf_torch = build_classifier_pipeline("torch")
+    _, _, clf_onnx = build_classifier_pipeline("onnx")
+    ref_scores, t_torch = _timed(_scores, clf_torch, texts)
+    got_scores, t_onnx = _timed(_scores, clf_onnx, texts)
+
+    label_mismatches = 0
+    max_diff = 0.0
+    for text, a, b in zip(texts, ref_scores, got_scores):
+        diff = max(abs(a[k] - b.get(k, 0.0)) for k in a)
+        max_diff = max(max_diff, diff)
+        if top_label(a) != top_label(b):
+            label_mismatches += 1
+            print(f"  label mismatch {text!r}: torch={top_label(a)} onnx={top_label(b)}")
+    print(
+        f"classifier: {len(texts) - label_mismatches}/{len(texts)} same top label  "
+        f"max|Δscore|={max_diff:.4f}  torch={t_torch:.3f}s onnx={t_onnx:.3f}s  "
+        f"(quantized={settings.ONNX_QUANTIZE})"
+    )
+
+    if label_mismatches or max_diff > args.tolerance:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
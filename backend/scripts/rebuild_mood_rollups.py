@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.db.mongodb import (
+    INDEXES, connect_to_mongo, close_mongo_connection, get_db, messages_collection, checkins_collection, mood_rollups_collection,
+)
+from app.services.rollups import day_start, message_inc
+
+Key = Tuple[str, datetime]
+Bounds = Dict[str, ObjectId | None]
+
+STAGING = "mood_rollups_rebuild"
+
+
+def _message_inc(doc: Dict[str, Any]) -> Dict[str, float]:
+    return message_inc(doc.get("emotion") or "unknown", doc.get("scores") or {})
+
+
+def _checkin_inc(doc: Dict[str, Any]) -> Dict[str, float]:
+    return {"checkins": 1, "checkin_score_sum": doc.get("score", 0)}
+
+
+SOURCES = {
+    # crisis messages still waiting for their scores are rolled up live once scored
+    "messages": (messages_collection, {"scores_pending": {"$ne": True}}, {"user_id": 1, "timestamp": 1, "emotion": 1, "scores": 1}, _message_inc),
+    "checkins": (checkins_collection, {}, {"user_id": 1, "timestamp": 1, "score": 1}, _checkin_inc),
+}
+
+
+async def newest_ids() -> Bounds:
+    bounds: Bounds = {}
+    for name, (collection, _, _, _) in SOURCES.items():
+        doc = await collection().find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        bounds[name] = doc["_id"] if doc else None
+    return bounds
+
+
+async def accumulate(scope: Dict[str, Any], after: Bounds, upto: Bounds, totals: Dict[Key, Dict[str, float]]) -> int:
+    """Add every document with `after < _id <= upto` to `totals`.
+
+    Ranges are on `_id` (insertion order), not `timestamp`: batch imports carry historical
+    timestamps, and the live $inc of a document follows its insert.
+    """
+    n = 0
+    for name, (collection, extra, projection, inc_of) in SOURCES.items():
+        if upto[name] is None:
+            continue
+        id_range: Dict[str, Any] = {"$lte": upto[name]}
+        if after.get(name) is not None:
+            id_range["$gt"] = after[name]
+        async for doc in collection().find({**scope, **extra, "_id": id_range}, projection):
+            inc = totals[(doc["user_id"], day_start(doc["timestamp"]))]
+            for key, value in inc_of(doc).items():
+                inc[key] += value
+            n += 1
+    return n
+
+
+async def flush(col, totals: Dict[Key, Dict[str, float]], batch_size: int) -> int:
+    ops: List[UpdateOne] = [
+        UpdateOne({"user_id": user_id, "day": day}, {"$inc": dict(inc)}, upsert=True) for (user_id, day), inc in totals.items()
+    ]
+    for start in range(0, len(ops), batch_size):
+        await col.bulk_write(ops[start:start + batch_size], ordered=False)
+    return len(ops)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Recompute the per-user daily mood rollups from messages and check-ins")
+    parser.add_argument("--user", default=None, help="Only rebuild this user_id")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Upserts per bulk_write")
+    parser.add_argument("--dry-run", action="store_true", help="Count but do not write")
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        scope: Dict[str, Any] = {"user_id": args.user} if args.user else {}
+        batch_size = max(1, args.batch_size)
+        started = time.perf_counter()
+        # Pin the boundary before reading anything: live writes keep $inc-ing the rollups,
+        # and only documents up to the boundary are counted here.
+        pinned = await newest_ids()
+        totals: Dict[Key, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        counted = await accumulate(scope, {}, pinned, totals)
+        print(f"{counted} messages and check-ins -> {len(totals)} daily rollups")
+        if args.dry_run:
+            return
+
+        if args.user:
+            # a single user's rollups are small: replace them in one short delete + upsert,
+            # after catching up with what was stored while reading
+            caught_up = await newest_ids()
+            await accumulate(scope, pinned, caught_up, totals)
+            await mood_rollups_collection().delete_many(scope)
+            written = await flush(mood_rollups_collection(), totals, batch_size)
+        else:
+            # build next to the live collection, which keeps serving and counting, then swap it in
+            db = get_db()
+            staging = db[STAGING]
+            await staging.drop()
+            for spec in INDEXES["mood_rollups"]:
+                await staging.create_index(spec.keys, name=spec.name, unique=spec.unique)
+            written = await flush(staging, totals, batch_size)
+            # documents stored during the build were only counted live; add them right before the swap
+            catch_up: Dict[Key, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+            caught_up = await newest_ids()
+            await accumulate(scope, pinned, caught_up, catch_up)
+            await flush(staging, catch_up, batch_size)
+            await staging.rename("mood_rollups", dropTarget=True)
+        print(f"Rebuilt {written} rollups in {time.perf_counter() - started:.1f}s")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
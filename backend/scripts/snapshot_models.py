@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from app.core.config import settings
+from app.services.model_store import MANIFEST, has_snapshot, snapshot_dir
+
+
+def snapshot(model_name: str, model_cls, root: str, force: bool):
+    from transformers import AutoTokenizer
+
+    dst = snapshot_dir(model_name, root)
+    if has_snapshot(model_name, root) and not force:
+        print(f"{model_name}: snapshot exists at {dst} (use --force to refresh)")
+        return
+    tmp = dst + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    started = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = model_cls.from_pretrained(model_name)
+    tokenizer.save_pretrained(tmp)
+    model.save_pretrained(tmp, safe_serialization=True)
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "model": model_name,
+                "revision": getattr(model.config, "_commit_hash", None),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "files": sorted(os.listdir(tmp)),
+            },
+            f,
+            indent=2,
+        )
+    # swap in the finished directory so a running app never sees a half-written snapshot
+    shutil.rmtree(dst, ignore_errors=True)
+    os.replace(tmp, dst)
+    print(f"{model_name}: saved to {dst} in {time.perf_counter() - started:.1f}s")
+
+
+def _memory() -> Dict[str, int]:
+    """Resident set in kB split into file-backed (shareable) and anonymous (private) pages."""
+    fields: Dict[str, int] = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    fields[key] = int(value.split()[0])
+    except OSError:
+        import resource
+
+        # ru_maxrss is kB on Linux and bytes on macOS; peak only, no shared/private split
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        fields["VmRSS"] = peak // 1024 if sys.platform == "darwin" else peak
+    return fields
+
+
+def probe():
+    """Child process of --measure: load both models the way the app does and report cost."""
+    started = time.perf_counter()
+    from app.services.nlp import build_classifier_pipeline, build_translation_model
+
+    imported = time.perf_counter()
+    build_classifier_pipeline("torch")
+    if settings.USE_TR_EN_TRANSLATION:
+        build_translation_model("torch")
+    loaded = time.perf_counter()
+    print(json.dumps({"import_s": imported - started, "load_s": loaded - imported, **_memory()}))
+
+
+def measure(root: str, runs: int):
+    modes = {"hub": "", "snapshot": root}
+    for mode, snapshot_root in modes.items():
+        env = dict(os.environ, MODEL_SNAPSHOT_DIR=snapshot_root, MODEL_SNAPSHOT_REQUIRED=str(mode == "snapshot"))
+        results: List[Dict[str, float]] = []
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--probe"], env=env, capture_output=True, text=True
+            )
+            if out.returncode != 0:
+                print(f"{mode}: probe failed\n{out.stderr.strip()}")
+                break
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        if not results:
+            continue
+        best = min(results, key=lambda r: r["load_s"])
+        mb = lambda key: f"{best[key] / 1024:.0f}MB" if key in best else "n/a"
+        print(
+            f"{mode:>8}: import={best['import_s']:.2f}s load={best['load_s']:.2f}s  "
+            f"rss={mb('VmRSS')} private={mb('RssAnon')} file-backed={mb('RssFile')}  (best of {len(results)})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot the HF models into a local directory as safetensors")
+    parser.add_argument("--out", default=settings.MODEL_SNAPSHOT_DIR or "models/snapshots", help="Snapshot root")
+    parser.add_argument("--force", action="store_true", help="Replace existing snapshots")
+    parser.add_argument("--measure", action="store_true", help="Compare startup time and RSS with and without snapshots")
+    parser.add_argument("--runs", type=int, default=3, help="Measurement runs per mode")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe()
+        return
+
+    from transformers import AutoModelForSequenceClassification, MarianMTModel
+
+    snapshot(settings.HF_MODEL_NAME, AutoModelForSequenceClassification, args.out, args.force)
+    if settings.USE_TR_EN_TRANSLATION:
+        snapshot(settings.HF_TR_EN_MODEL, MarianMTModel, args.out, args.force)
+    if args.measure:
+        measure(os.path.abspath(args.out), args.runs)
+
+
+if __name__ == "__main__":
+    main()
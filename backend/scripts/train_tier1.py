@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import math
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, messages_collection
+from app.services.cascade import Tier1Model, featurize
+from app.services.nlp import _normalize_tr_text
+
+
+async def load_examples(limit: int) -> List[Tuple[str, str]]:
+    # only labels the transformer produced: not tier 1's own output, not keyword-only
+    # (degraded or crisis-pending) labels; "uncertain" carries no class signal
+    col = messages_collection()
+    query = {
+        "emotion": {"$nin": ["uncertain", "unknown", None]},
+        "model_version": {"$not": {"$regex": "^tier1:"}, "$ne": "keywords"},
+        "degraded": {"$ne": True},
+        "scores_pending": {"$ne": True},
+    }
+    cursor = col.find(query, {"text": 1, "emotion": 1})
+    if limit:
+        cursor = cursor.limit(limit)
+    return [(d["text"], d["emotion"]) async for d in cursor if d.get("text")]
+
+
+def build_vocab(docs: List[List[str]], min_df: int, max_features: int) -> Tuple[Dict[str, int], np.ndarray]:
+    df: Dict[str, int] = {}
+    for terms in docs:
+        for term in set(terms):
+            df[term] = df.get(term, 0) + 1
+    kept = sorted((t for t, n in df.items() if n >= min_df), key=lambda t: -df[t])[:max_features]
+    vocab = {t: i for i, t in enumerate(kept)}
+    n = len(docs)
+    idf = np.array([math.log((1 + n) / (1 + df[t])) + 1.0 for t in kept], dtype=np.float32)
+    return vocab, idf
+
+
+def vectorize(terms: List[str], vocab: Dict[str, int], idf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    counts: Dict[int, int] = {}
+    for term in terms:
+        j = vocab.get(term)
+        if j is not None:
+            counts[j] = counts.get(j, 0) + 1
+    idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    val = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * idf[idx]
+    norm = float(np.linalg.norm(val)) or 1.0
+    return idx, val / norm
+
+
+def train(rows, y: np.ndarray, n_features: int, n_labels: int, epochs: int, lr: float, l2: float, batch: int):
+    """Mini-batch softmax regression over sparse TF-IDF rows."""
+    W = np.zeros((n_features, n_labels), dtype=np.float32)
+    b = np.zeros(n_labels, dtype=np.float32)
+    order = list(range(len(rows)))
+    for epoch in range(epochs):
+        random.shuffle(order)
+        loss = 0.0
+        for start in range(0, len(order), batch):
+            ids = order[start:start + batch]
+            X = np.zeros((len(ids), n_features), dtype=np.float32)
+            for r, i in enumerate(ids):
+                idx, val = rows[i]
+                X[r, idx] = val
+            logits = X @ W + b
+            logits -= logits.max(axis=1, keepdims=True)
+            P = np.exp(logits)
+            P /= P.sum(axis=1, keepdims=True)
+            target = y[ids]
+            loss -= float(np.log(P[np.arange(len(ids)), target] + 1e-9).sum())
+            P[np.arange(len(ids)), target] -= 1.0
+            W -= lr * (X.T @ P / len(ids) + l2 * W)
+            b -= lr * P.mean(axis=0)
+        print(f"epoch {epoch + 1}/{epochs} loss={loss / len(order):.4f}")
+    return W, b
+
+
+def evaluate(model: Tier1Model, examples: List[Tuple[str, str]], threshold: float):
+    from app.services.nlp import is_uncertain
+
+    correct = confident = confident_correct = 0
+    for text, label in examples:
+        scores = model.predict(_normalize_tr_text(text))
+        pred = max(scores.items(), key=lambda kv: kv[1])[0]
+        correct += pred == label
+        if not is_uncertain(scores, threshold=threshold):
+            confident += 1
+            confident_correct += pred == label
+    n = len(examples) or 1
+    print(
+        f"holdout accuracy={correct / n:.3f}  tier-1 coverage@{threshold}={confident / n:.3f}  "
+        f"accuracy when confident={confident_correct / (confident or 1):.3f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Train the tier-1 TF-IDF classifier from stored message labels")
+    parser.add_argument("--out", default=settings.CASCADE_MODEL_PATH, help="Output JSON path")
+    parser.add_argument("--limit", type=int, default=0, help="Max messages to read (0 = all)")
+    parser.add_argument("--min-df", type=int, default=2)
+    parser.add_argument("--max-features", type=int, default=20000)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--lr", type=float, default=2.0)
+    parser.add_argument("--l2", type=float, default=1e-5)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--holdout", type=float, default=0.1, help="Share of examples kept for evaluation")
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    examples = await load_examples(args.limit)
+    await close_mongo_connection()
+    if not examples:
+        print("No labelled messages found")
+        return
+
+    random.seed(13)
+    random.shuffle(examples)
+    n_hold = int(len(examples) * args.holdout)
+    holdout, train_set = examples[:n_hold], examples[n_hold:]
+
+    labels = sorted({label for _, label in train_set})
+    label_idx = {label: i for i, label in enumerate(labels)}
+    docs = [featurize(_normalize_tr_text(text)) for text, _ in train_set]
+    vocab, idf = build_vocab(docs, args.min_df, args.max_features)
+    rows = [vectorize(terms, vocab, idf) for terms in docs]
+    y = np.array([label_idx[label] for _, label in train_set], dtype=np.int64)
+    print(f"{len(train_set)} examples, {len(labels)} labels, {len(vocab)} terms")
+
+    W, b = train(rows, y, len(vocab), len(labels), args.epochs, args.lr, args.l2, args.batch)
+    model = Tier1Model(
+        labels=labels,
+        bias=[round(float(v), 6) for v in b],
+        vocab={term: [round(float(idf[j]), 6), [round(float(w), 6) for w in W[j]]] for term, j in vocab.items()},
+    )
+    if holdout:
+        evaluate(model, holdout, settings.CASCADE_THRESHOLD)
+    model.save(args.out)
+    print(f"Saved tier-1 model to {args.out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
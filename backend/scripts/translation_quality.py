@@ -0,0 +1,115 @@
+import argparse
+import math
+import sys
+import time
+from collections import Counter
+from typing import List
+
+from app.core.config import settings
+from app.services.nlp import build_translation_model, generate_translations
+
+# Fixed Turkish test set: short check-ins, everyday sentences and a few longer journal-style entries
+SAMPLES: List[str] = [
+    "Çok yorgunum.",
+    "Bugün kendimi iyi hissediyorum.",
+    "Moralim bozuk.",
+    "Yarınki sınav için çok endişeliyim.",
+    "Patronuma çok sinirliyim, beni hiç dinlemiyor.",
+    "Ailemi çok seviyorum ve onlarla vakit geçirmek bana iyi geliyor.",
+    "Bunu hiç beklemedim, gerçekten şaşırdım.",
+    "Yalnız hissediyorum ve kimse beni anlamıyor.",
+    "Sabah erkenden kalktım, yürüyüşe çıktım ve kahvaltı hazırladım.",
+    "Son birkaç haftadır uyumakta zorlanıyorum, gece boyunca sürekli uyanıyorum.",
+    "Arkadaşımla tartıştık ve şimdi ne yapacağımı bilmiyorum.",
+    "İş yerinde yeni bir projeye başladım, biraz heyecanlıyım ama aynı zamanda korkuyorum.",
+    "Bugün hava çok güzeldi, parkta oturup kitap okudum.",
+    "Annem hastanede ve onun için çok kaygılanıyorum.",
+    "Hiçbir şey yapmak istemiyorum, sadece yatakta kalmak istiyorum.",
+    "Terapistimle konuştuktan sonra kendimi daha hafif hissettim.",
+    "Sınavdan yüksek not aldım, çok mutluyum!",
+    "Bazen her şeyin üstüme geldiğini hissediyorum ve nefes alamıyorum.",
+    "Kardeşimin doğum günü için sürpriz bir parti hazırladık, herkes çok eğlendi.",
+    "Geçen yıl taşındığımdan beri eski arkadaşlarımı özlüyorum. Yeni şehirde kimseyi tanımıyorum "
+    "ve hafta sonları genellikle evde yalnız kalıyorum. Yine de yavaş yavaş alışmaya çalışıyorum.",
+]
+
+
+def _ngrams(tokens: List[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def corpus_bleu(hypotheses: List[str], references: List[str], max_n: int = 4) -> float:
+    """Corpus BLEU (0-100) with one reference per sentence, whitespace tokens and add-one smoothing."""
+    matches = [0] * max_n
+    totals = [0] * max_n
+    hyp_len = ref_len = 0
+    for hyp, ref in zip(hypotheses, references):
+        h, r = hyp.lower().split(), ref.lower().split()
+        hyp_len += len(h)
+        ref_len += len(r)
+        for n in range(1, max_n + 1):
+            h_grams, r_grams = _ngrams(h, n), _ngrams(r, n)
+            matches[n - 1] += sum(min(c, r_grams[g]) for g, c in h_grams.items())
+            totals[n - 1] += max(0, len(h) - n + 1)
+    if hyp_len == 0:
+        return 0.0
+    log_precision = sum(math.log((m + 1) / (t + 1)) for m, t in zip(matches, totals)) / max_n
+    brevity = 1.0 if hyp_len > ref_len else math.exp(1 - ref_len / hyp_len)
+    return 100 * brevity * math.exp(log_precision)
+
+
+def _timed(fn, repeats: int):
+    best = float("inf")
+    out = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return out, best
+
+
+def _reference(tokenizer, model, texts: List[str], args) -> List[str]:
+    outputs = []
+    for start in range(0, len(texts), max(1, args.batch_size)):
+        enc = tokenizer(texts[start:start + args.batch_size], return_tensors="pt", padding=True, truncation=True)
+        out = model.generate(**enc, num_beams=args.reference_beams, max_length=512)
+        outputs.extend(tokenizer.batch_decode(out, skip_special_tokens=True))
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fast translation mode against beam search on a fixed Turkish set")
+    parser.add_argument("--reference-beams", type=int, default=4, help="Beam count of the reference decode")
+    parser.add_argument("--beams", type=int, default=settings.TRANSLATION_NUM_BEAMS, help="Beam count of the fast mode")
+    parser.add_argument("--batch-size", type=int, default=settings.NLP_INFERENCE_BATCH_SIZE)
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per mode (best is reported)")
+    parser.add_argument("--min-bleu", type=float, default=0.0, help="Exit non-zero when BLEU vs the reference is lower")
+    parser.add_argument("--backend", default=settings.NLP_BACKEND)
+    parser.add_argument("--show", action="store_true", help="Print every differing translation")
+    args = parser.parse_args()
+
+    tokenizer, model = build_translation_model(args.backend)
+    texts = list(SAMPLES)
+    # the reference keeps the old flat 512-token limit so it measures the whole change
+    reference, t_ref = _timed(lambda: _reference(tokenizer, model, texts, args), args.repeats)
+    fast, t_fast = _timed(
+        lambda: generate_translations(tokenizer, model, texts, args.batch_size, num_beams=args.beams), args.repeats
+    )
+
+    same = sum(1 for a, b in zip(reference, fast) if a.strip() == b.strip())
+    bleu = corpus_bleu(fast, reference)
+    print(
+        f"reference beams={args.reference_beams}: {t_ref:.3f}s  fast beams={args.beams}: {t_fast:.3f}s  "
+        f"speedup={t_ref / t_fast if t_fast else float('inf'):.2f}x"
+    )
+    print(f"BLEU vs reference={bleu:.1f}  identical={same}/{len(texts)}")
+    if args.show:
+        for src, a, b in zip(texts, reference, fast):
+            if a.strip() != b.strip():
+                print(f"  ~ {src!r}\n    reference: {a!r}\n    fast:      {b!r}")
+    if bleu < args.min_bleu:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()